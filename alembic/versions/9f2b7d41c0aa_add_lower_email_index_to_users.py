@@ -0,0 +1,34 @@
+"""Add lower(email) unique index to users
+
+Revision ID: 9f2b7d41c0aa
+Revises: b93e314740f6
+Create Date: 2026-08-31 09:14:22.103944
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f2b7d41c0aa'
+down_revision: Union[str, None] = 'b93e314740f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Normalize any existing mixed-case emails first so the unique
+    # expression index can be created
+    op.execute("UPDATE users SET email = lower(email) WHERE email <> lower(email)")
+    op.create_index(
+        "ix_users_email_lower",
+        "users",
+        [sa.text("lower(email)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_lower", table_name="users")
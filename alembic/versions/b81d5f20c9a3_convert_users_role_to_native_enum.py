@@ -0,0 +1,32 @@
+"""Convert users.role to a native PG enum
+
+Revision ID: b81d5f20c9a3
+Revises: f4a9c0d7e512
+Create Date: 2026-08-31 11:38:12.490877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81d5f20c9a3'
+down_revision: Union[str, None] = 'f4a9c0d7e512'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_ROLE_VALUES = ('admin', 'hq', 'state', 'school', 'accountant', 'zone')
+
+
+def upgrade() -> None:
+    user_role = postgresql.ENUM(*_ROLE_VALUES, name='user_role')
+    user_role.create(op.get_bind(), checkfirst=True)
+    op.execute("ALTER TABLE users ALTER COLUMN role TYPE user_role USING role::user_role")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE users ALTER COLUMN role TYPE varchar USING role::text")
+    postgresql.ENUM(name='user_role').drop(op.get_bind(), checkfirst=True)
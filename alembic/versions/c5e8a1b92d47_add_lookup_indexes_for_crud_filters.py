@@ -0,0 +1,52 @@
+"""Add lookup indexes for CRUD filter columns
+
+Revision ID: c5e8a1b92d47
+Revises: 9f2b7d41c0aa
+Create Date: 2026-08-31 09:41:07.556218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a1b92d47'
+down_revision: Union[str, None] = '9f2b7d41c0aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_states_zone_code", "states", ["zone_code"])
+    op.create_index("ix_lgas_state_code", "lgas", ["state_code"])
+    op.create_index("ix_custodians_state_code", "custodians", ["state_code"])
+    op.create_index("ix_custodians_lga_code", "custodians", ["lga_code"])
+    op.create_index("ix_bece_custodians_state_code", "bece_custodians", ["state_code"])
+    op.create_index("ix_bece_custodians_lga_code", "bece_custodians", ["lga_code"])
+    op.create_index("ix_schools_state_code", "schools", ["state_code"])
+    op.create_index("ix_schools_lga_code", "schools", ["lga_code"])
+    op.create_index("ix_schools_custodian_code", "schools", ["custodian_code"])
+    op.create_index("ix_schools_state_lga_cust", "schools", ["state_code", "lga_code", "custodian_code"])
+    op.create_index("ix_bece_schools_state_code", "bece_schools", ["state_code"])
+    op.create_index("ix_bece_schools_lga_code", "bece_schools", ["lga_code"])
+    op.create_index("ix_bece_schools_custodian_code", "bece_schools", ["custodian_code"])
+    op.create_index("ix_bece_schools_state_lga_cust", "bece_schools", ["state_code", "lga_code", "custodian_code"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bece_schools_state_lga_cust", table_name="bece_schools")
+    op.drop_index("ix_bece_schools_custodian_code", table_name="bece_schools")
+    op.drop_index("ix_bece_schools_lga_code", table_name="bece_schools")
+    op.drop_index("ix_bece_schools_state_code", table_name="bece_schools")
+    op.drop_index("ix_schools_state_lga_cust", table_name="schools")
+    op.drop_index("ix_schools_custodian_code", table_name="schools")
+    op.drop_index("ix_schools_lga_code", table_name="schools")
+    op.drop_index("ix_schools_state_code", table_name="schools")
+    op.drop_index("ix_bece_custodians_lga_code", table_name="bece_custodians")
+    op.drop_index("ix_bece_custodians_state_code", table_name="bece_custodians")
+    op.drop_index("ix_custodians_lga_code", table_name="custodians")
+    op.drop_index("ix_custodians_state_code", table_name="custodians")
+    op.drop_index("ix_lgas_state_code", table_name="lgas")
+    op.drop_index("ix_states_zone_code", table_name="states")
@@ -0,0 +1,34 @@
+"""Add accreditation-status and user state_code indexes
+
+Revision ID: f4a9c0d7e512
+Revises: c5e8a1b92d47
+Create Date: 2026-08-31 11:02:45.718306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9c0d7e512'
+down_revision: Union[str, None] = 'c5e8a1b92d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_state_code", "users", ["state_code"])
+    op.create_index("ix_schools_accreditation_status", "schools", ["accreditation_status"])
+    op.create_index("ix_schools_status_state", "schools", ["accreditation_status", "state_code"])
+    op.create_index("ix_bece_schools_accreditation_status", "bece_schools", ["accreditation_status"])
+    op.create_index("ix_bece_schools_status_state", "bece_schools", ["accreditation_status", "state_code"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bece_schools_status_state", table_name="bece_schools")
+    op.drop_index("ix_bece_schools_accreditation_status", table_name="bece_schools")
+    op.drop_index("ix_schools_status_state", table_name="schools")
+    op.drop_index("ix_schools_accreditation_status", table_name="schools")
+    op.drop_index("ix_users_state_code", table_name="users")
@@ -46,7 +46,6 @@ async def create_audit_log(
     )
     db.add(audit_log)
     await db.commit()
-    await db.refresh(audit_log)
     return audit_log
 
 @router.get("/audit-logs", response_model=List[AuditLogResponse])
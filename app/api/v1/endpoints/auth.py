@@ -1,21 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from app.infrastructure.database.session import get_db
 from app.infrastructure.database.models import User, UserRole
 from app.api.v1.schemas import Token, UserLogin, UserChangePassword
 from app.core.security import verify_password, get_password_hash
-from app.core.auth import create_access_token, get_current_user, check_role, check_super_admin
+from app.core.auth import create_access_token, get_current_user, check_role, check_super_admin, invalidate_user_cache
 from app.core.audit_logger import log_activity, AuditAction, AuditResource
 
 router = APIRouter()
 
+# Verified against when the email does not match a user, so a missing
+# account costs the same as a wrong password and cannot be detected by
+# timing the response.
+_DUMMY_HASH = get_password_hash("!not-a-real-password!")
+
+
+async def _check_login(user, plain_password: str) -> bool:
+    if user is None:
+        await run_in_threadpool(verify_password, plain_password, _DUMMY_HASH)
+        return False
+    return await run_in_threadpool(verify_password, plain_password, user.hashed_password)
+
+
 @router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db), request: Request = None):
-    result = await db.execute(select(User).filter(User.email == form_data.username))
-    user = result.scalars().first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    result = await db.execute(select(User).filter(func.lower(User.email) == form_data.username.strip().lower()))
+    user = result.scalar_one_or_none()
+    if not await _check_login(user, form_data.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -50,9 +64,9 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
 
 @router.post("/login-json", response_model=Token)
 async def login_json(user_data: UserLogin, db: AsyncSession = Depends(get_db), request: Request = None):
-    result = await db.execute(select(User).filter(User.email == user_data.email))
-    user = result.scalars().first()
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    result = await db.execute(select(User).filter(func.lower(User.email) == user_data.email.strip().lower()))
+    user = result.scalar_one_or_none()
+    if not await _check_login(user, user_data.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -92,14 +106,14 @@ async def reset_password(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_super_admin())
 ):
-    result = await db.execute(select(User).filter(User.email == email))
-    user = result.scalars().first()
+    result = await db.execute(select(User).filter(func.lower(User.email) == email.strip().lower()))
+    user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    from app.core.security import get_password_hash
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = await run_in_threadpool(get_password_hash, new_password)
     await db.commit()
+    invalidate_user_cache(user.email)
     return {"message": f"Password for {email} has been reset"}
 
 @router.get("/me")
@@ -118,14 +132,15 @@ async def change_password(
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
-    if not verify_password(password_data.old_password, current_user.hashed_password):
+    if not await run_in_threadpool(verify_password, password_data.old_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect old password"
         )
     
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    current_user.hashed_password = await run_in_threadpool(get_password_hash, password_data.new_password)
     db.add(current_user)
+    invalidate_user_cache(current_user.email)
     
     try:
         await log_activity(
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, File, UploadFile, Request
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, File, UploadFile, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+import hashlib
 import os
 import shutil
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from sqlalchemy import select, text, func, delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List, Optional
 from pydantic import BaseModel
 from app.infrastructure.database.session import get_db
-from app.infrastructure.database.models import State, LGA, Zone, Custodian, BECECustodian, School, BECESchool, User, UserRole, AccreditationType
+from app.infrastructure.database.models import State, LGA, Zone, Custodian, BECECustodian, School, BECESchool, User, UserRole, AccreditationStatus, AccreditationType
 from app.api.v1 import schemas_data as schemas
-from app.core.auth import get_current_user, check_role, check_state_not_locked, check_super_admin
+from app.core.auth import get_current_user, check_role, check_state_not_locked, check_super_admin, invalidate_lock_cache, invalidate_user_cache
 from app.core.security import get_password_hash
 from app.core.email_service import (
     generate_password, 
@@ -20,36 +24,70 @@ from app.core.email_service import (
 from app.core.pdf_service import generate_state_accreditation_report
 from app.core.certificate_service import generate_certificate
 from app.core.audit_logger import log_activity, AuditAction, AuditResource
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
+from app.core.config import get_settings
+from sqlalchemy.orm import selectinload
+from datetime import date, datetime
 
 router = APIRouter()
 
+# Roles with unrestricted read access, checked inline in the list endpoints
+_UNRESTRICTED_READ_ROLES = frozenset((UserRole.ADMIN.value, UserRole.HQ.value, UserRole.ACCOUNTANT.value))
+
+# Projected column sets for the list endpoints. Loading Core rows instead of
+# full ORM entities skips the identity map and per-attribute instrumentation,
+# which dominates CPU on large result sets.
+_STATE_COLS = (State.code, State.name, State.capital, State.email, State.ministry_email, State.zone_code, State.status, State.is_locked)
+_ZONE_COLS = (Zone.code, Zone.name, Zone.zone_email)
+_LGA_COLS = (LGA.code, LGA.name, LGA.state_code)
+_CUSTODIAN_COLS = (Custodian.code, Custodian.name, Custodian.state_code, Custodian.lga_code, Custodian.town, Custodian.status)
+_BECE_CUSTODIAN_COLS = (BECECustodian.code, BECECustodian.name, BECECustodian.state_code, BECECustodian.lga_code, BECECustodian.town, BECECustodian.status)
+_SCHOOL_COLS = (
+    School.code, School.name, School.state_code, School.lga_code, School.custodian_code,
+    School.email, School.accreditation_status, School.accreditation_type, School.accredited_date,
+    School.category, School.accrd_year, School.payment_url, School.approval_status,
+    School.gender, School.status,
+)
+_BECE_SCHOOL_COLS = (
+    BECESchool.code, BECESchool.name, BECESchool.state_code, BECESchool.lga_code, BECESchool.custodian_code,
+    BECESchool.email, BECESchool.accreditation_status, BECESchool.accreditation_type, BECESchool.accredited_date,
+    BECESchool.category, BECESchool.accrd_year, BECESchool.payment_url, BECESchool.approval_status,
+    BECESchool.gender, BECESchool.status,
+)
+
+
+def _accredited_date_now():
+    """Timestamp for accredited_date, matching the ISO strings already stored.
+
+    The column is a String holding datetime.isoformat() values that the
+    scheduler and certificate service parse back, so the stamp stays
+    app-generated rather than moving to SQL now().
+    """
+    return datetime.now().isoformat()
+
 
 # --- Helper: Auto-create or update user for a state email ---
 async def _create_or_update_state_user(db: AsyncSession, state_code: str, state_name: str, email: str, background_tasks: BackgroundTasks):
     """Create a user for the state email if it doesn't exist, or update/reset the existing one."""
-    result = await db.execute(select(User).filter(User.email == email))
-    existing_user = result.scalars().first()
+    email = email.strip().lower()
     
-    # Generate a random 8-digit password
+    # Generate a random 8-digit password; the password is reset either way,
+    # so create-or-update collapses into a single upsert
     password = generate_password(8)
-    
-    if existing_user:
-        # Update existing user's state_code and reset password
-        existing_user.state_code = state_code
-        existing_user.hashed_password = get_password_hash(password)
-        db.add(existing_user)
-    else:
-        # Create new user
-        new_user = User(
-            email=email,
-            hashed_password=get_password_hash(password),
-            role=UserRole.STATE.value,
-            state_code=state_code,
-            is_active=True,
-        )
-        db.add(new_user)
+    hashed = await run_in_threadpool(get_password_hash, password)
+    
+    stmt = pg_insert(User).values(
+        email=email,
+        hashed_password=hashed,
+        role=UserRole.STATE.value,
+        state_code=state_code,
+        is_active=True,
+    ).on_conflict_do_update(
+        index_elements=[User.email],
+        # An existing user keeps its role; only reassign the state and password
+        set_={"state_code": state_code, "hashed_password": hashed},
+    )
+    await db.execute(stmt)
+    invalidate_user_cache(email)
     
     # Send credentials via email in the background
     background_tasks.add_task(send_credentials_email, email, password, state_name)
@@ -59,27 +97,26 @@ async def _create_or_update_state_user(db: AsyncSession, state_code: str, state_
 
 async def _create_or_update_zone_user(db: AsyncSession, zone_code: str, zone_name: str, email: str, background_tasks: BackgroundTasks):
     """Create a user for the zone email if it doesn't exist, or update/reset the existing one."""
-    result = await db.execute(select(User).filter(User.email == email))
-    existing_user = result.scalars().first()
+    email = email.strip().lower()
     
-    # Generate a random 8-digit password
+    # Generate a random 8-digit password; the password is reset either way,
+    # so create-or-update collapses into a single upsert
     password = generate_password(8)
-    
-    if existing_user:
-        # Update existing user's zone_code and reset password
-        existing_user.zone_code = zone_code
-        existing_user.hashed_password = get_password_hash(password)
-        db.add(existing_user)
-    else:
-        # Create new user
-        new_user = User(
-            email=email,
-            hashed_password=get_password_hash(password),
-            role=UserRole.ZONE.value,
-            zone_code=zone_code,
-            is_active=True,
-        )
-        db.add(new_user)
+    hashed = await run_in_threadpool(get_password_hash, password)
+    
+    stmt = pg_insert(User).values(
+        email=email,
+        hashed_password=hashed,
+        role=UserRole.ZONE.value,
+        zone_code=zone_code,
+        is_active=True,
+    ).on_conflict_do_update(
+        index_elements=[User.email],
+        # An existing user keeps its role; only reassign the zone and password
+        set_={"zone_code": zone_code, "hashed_password": hashed},
+    )
+    await db.execute(stmt)
+    invalidate_user_cache(email)
     
     # Send credentials via email in the background
     background_tasks.add_task(send_credentials_email, email, password, zone_name, "Zonal Coordinator")
@@ -87,6 +124,14 @@ async def _create_or_update_zone_user(db: AsyncSession, zone_code: str, zone_nam
     return password
 
 
+def _add_years(d: date, years: int) -> date:
+    """Shift a date by whole years, clamping Feb 29 to Feb 28 off leap years."""
+    try:
+        return d.replace(year=d.year + years)
+    except ValueError:
+        return d.replace(year=d.year + years, day=28)
+
+
 def _calculate_expiry_date(accredited_date_str: str, accreditation_status: str, zone_code: str) -> str:
     """
     Calculate expiry date based on zone and accreditation status.
@@ -113,7 +158,7 @@ def _calculate_expiry_date(accredited_date_str: str, accreditation_status: str,
             else:
                 validity_years = 0
         
-        expiry_date = acc_date + relativedelta(years=validity_years)
+        expiry_date = _add_years(acc_date, validity_years)
         return expiry_date.isoformat()
     except Exception as e:
         print(f"Error calculating expiry: {e}")
@@ -121,24 +166,26 @@ def _calculate_expiry_date(accredited_date_str: str, accreditation_status: str,
 
 
 # --- States ---
-@router.get("/states", response_model=List[schemas.State])
+@router.get("/states", response_model=List[schemas.State], response_class=ORJSONResponse, response_model_exclude_none=True)
 async def get_states(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
     # Admin, HQ, and Accountant can see all, State users see only their state, Zone users see states in their zone
-    if current_user.role in [UserRole.ADMIN.value, UserRole.HQ.value, UserRole.ACCOUNTANT.value]:
-        result = await db.execute(select(State))
-        states = result.scalars().all()
+    query = select(*_STATE_COLS)
+    if current_user.role in _UNRESTRICTED_READ_ROLES:
+        pass
     elif current_user.role == UserRole.ZONE.value:
-        result = await db.execute(select(State).filter(State.zone_code == current_user.zone_code))
-        states = result.scalars().all()
+        query = query.filter(State.zone_code == current_user.zone_code)
     else:
-        result = await db.execute(select(State).filter(State.code == current_user.state_code))
-        states = result.scalars().all()
-    
-    return states
+        query = query.filter(State.code == current_user.state_code)
+
+    rows = (await db.execute(query)).mappings()
+    # States change rarely; let clients reuse their copy for a minute
+    response.headers["Cache-Control"] = "private, max-age=60"
+    return [schemas.State.model_construct(**row) for row in rows]
 
 @router.get("/states/{code}", response_model=schemas.State)
 async def get_state(
@@ -168,15 +215,24 @@ async def create_state(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    db_state = State(**state.dict())
-    db.add(db_state)
-    await db.commit()
-    await db.refresh(db_state)
+    state_data = state.model_dump()
+    # Single round-trip upsert: retrying a create after a partial failure no
+    # longer dies on the primary key
+    stmt = (
+        pg_insert(State)
+        .values(**state_data)
+        .on_conflict_do_update(
+            index_elements=[State.code],
+            set_={key: value for key, value in state_data.items() if key != "code"},
+        )
+        .returning(State)
+    )
+    db_state = (await db.execute(stmt)).scalar_one()
     
     # Auto-create user if email is provided
     if state.email:
         await _create_or_update_state_user(db, db_state.code, db_state.name, state.email, background_tasks)
-        await db.commit()
+    await db.commit()
     
     # Log the CREATE activity for non-admin users
     if current_user.role != UserRole.ADMIN.value:
@@ -210,21 +266,18 @@ async def update_state(
     if current_user.role == UserRole.STATE.value and current_user.state_code != code:
         raise HTTPException(status_code=403, detail="Permission denied")
         
-    result = await db.execute(select(State).filter(State.code == code))
-    db_state = result.scalars().first()
-    if not db_state:
+    old_email = (await db.execute(select(State.email).filter(State.code == code))).one_or_none()
+    if old_email is None:
         raise HTTPException(status_code=404, detail="State not found")
+    old_email = old_email.email
     
-    old_email = db_state.email
-    
-    update_data = state_in.dict(exclude_unset=True)
+    update_data = state_in.model_dump(exclude_unset=True)
     
     # Security: State users cannot lock/unlock states
     if current_user.role == UserRole.STATE.value:
         update_data.pop("is_locked", None)
     
     # Security: Only super admin can change state email (Reset Password)
-    from app.core.config import get_settings
     settings = get_settings()
     if update_data.get("email") and update_data.get("email") != old_email:
         if current_user.email != settings.ADMIN_EMAIL:
@@ -233,18 +286,19 @@ async def update_state(
                 detail="Only the super administrator can update state email addresses (Password Reset)"
             )
         
-    for field, value in update_data.items():
-        setattr(db_state, field, value)
-    
-    db.add(db_state)
-    await db.commit()
-    await db.refresh(db_state)
+    if update_data:
+        result = await db.execute(
+            update(State).where(State.code == code).values(**update_data).returning(State)
+        )
+        db_state = result.scalar_one()
+    else:
+        db_state = (await db.execute(select(State).filter(State.code == code))).scalar_one()
     
     # Auto-create user if email is newly set or changed
     new_email = update_data.get("email")
     if new_email and new_email != old_email:
         await _create_or_update_state_user(db, db_state.code, db_state.name, new_email, background_tasks)
-        await db.commit()
+    await db.commit()
     
     if current_user.role != UserRole.ADMIN.value:
         try:
@@ -254,6 +308,22 @@ async def update_state(
     
     return db_state
 
+@router.delete("/states/all", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_all_states(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
+):
+    # One statement for both tables: drop the state users and the states in a
+    # single round-trip
+    await db.execute(text(
+        "WITH removed_users AS ("
+        "  DELETE FROM users WHERE role = :role"
+        ") DELETE FROM states"
+    ), {"role": UserRole.STATE.value})
+    await db.commit()
+    invalidate_user_cache()
+    return None
+
 @router.delete("/states/{code}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_state(
     code: str,
@@ -261,13 +331,10 @@ async def delete_state(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    result = await db.execute(select(State).filter(State.code == code))
-    db_state = result.scalars().first()
-    if not db_state:
+    result = await db.execute(delete(State).where(State.code == code).returning(State.name))
+    state_name = result.scalar_one_or_none()
+    if state_name is None:
         raise HTTPException(status_code=404, detail="State not found")
-    
-    state_name = db_state.name
-    await db.delete(db_state)
     await db.commit()
     
     if current_user.role != UserRole.ADMIN.value:
@@ -286,7 +353,6 @@ async def send_state_report(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    from sqlalchemy.orm import selectinload
     # 1. Fetch State
     result = await db.execute(select(State).filter(State.code == code))
     state = result.scalars().first()
@@ -348,6 +414,35 @@ async def send_state_report(
 # --- State Lock/Unlock (Admin only) ---
 class LockRequest(BaseModel):
     state_code: Optional[str] = None  # None means all states
+    state_codes: Optional[List[str]] = None  # Batch lock/unlock
+
+
+async def _set_states_locked(db: AsyncSession, request: LockRequest, locked: bool):
+    """Apply the lock flag with a single UPDATE, whether for one, many or all states."""
+    action = "locked" if locked else "unlocked"
+    codes = request.state_codes or ([request.state_code] if request.state_code else None)
+    if codes:
+        result = await db.execute(
+            update(State)
+            .where(State.code.in_(codes))
+            .values(is_locked=locked)
+            .returning(State.name, State.code)
+        )
+        rows = result.all()
+        if not rows:
+            raise HTTPException(status_code=404, detail="State not found")
+        await db.commit()
+        invalidate_lock_cache()
+        if len(rows) == 1:
+            name, code = rows[0]
+            return {"message": f"State {name} ({code}) has been {action}"}
+        return {"message": f"{len(rows)} states have been {action}"}
+    else:
+        await db.execute(update(State).values({State.is_locked: locked}))
+        await db.commit()
+        invalidate_lock_cache()
+        return {"message": f"All states have been {action}"}
+
 
 @router.post("/states/lock")
 async def lock_states(
@@ -355,22 +450,7 @@ async def lock_states(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_super_admin())
 ):
-    if request.state_code:
-        result = await db.execute(select(State).filter(State.code == request.state_code))
-        state = result.scalars().first()
-        if not state:
-            raise HTTPException(status_code=404, detail="State not found")
-        state.is_locked = True
-        state_name = state.name
-        state_code = state.code
-        db.add(state)
-        await db.commit()
-        return {"message": f"State {state_name} ({state_code}) has been locked"}
-    else:
-        from sqlalchemy import update
-        await db.execute(update(State).values({State.is_locked: True}))
-        await db.commit()
-        return {"message": "All states have been locked"}
+    return await _set_states_locked(db, request, True)
 
 @router.post("/states/unlock")
 async def unlock_states(
@@ -378,33 +458,27 @@ async def unlock_states(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_super_admin())
 ):
-    if request.state_code:
-        result = await db.execute(select(State).filter(State.code == request.state_code))
-        state = result.scalars().first()
-        if not state:
-            raise HTTPException(status_code=404, detail="State not found")
-        state.is_locked = False
-        state_name = state.name
-        state_code = state.code
-        db.add(state)
-        await db.commit()
-        return {"message": f"State {state_name} ({state_code}) has been unlocked"}
-    else:
-        from sqlalchemy import update
-        await db.execute(update(State).values({State.is_locked: False}))
-        await db.commit()
-        return {"message": "All states have been unlocked"}
+    return await _set_states_locked(db, request, False)
 
 
 # --- Zones ---
-@router.get("/zones", response_model=List[schemas.Zone])
+@router.get("/zones", response_model=List[schemas.Zone], response_class=ORJSONResponse, response_model_exclude_none=True)
 async def get_zones(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     # Everyone can see zones (they are general)
-    result = await db.execute(select(Zone))
-    return result.scalars().all()
+    rows = (await db.execute(select(*_ZONE_COLS))).mappings().all()
+    
+    # Zones are near-static, so an ETag lets repeat visitors skip the body
+    etag = '"%s"' % hashlib.md5(repr([tuple(row.values()) for row in rows]).encode()).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, max-age=60"
+    return [schemas.Zone.model_construct(**row) for row in rows]
 
 @router.get("/zones/{code}", response_model=schemas.Zone)
 async def get_zone(
@@ -431,10 +505,9 @@ async def create_zone(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    db_zone = Zone(**zone.dict())
+    db_zone = Zone(**zone.model_dump())
     db.add(db_zone)
     await db.commit()
-    await db.refresh(db_zone)
     
     # Auto-create user if zone_email is provided
     if zone.zone_email:
@@ -458,26 +531,25 @@ async def update_zone(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    result = await db.execute(select(Zone).filter(Zone.code == code))
-    db_zone = result.scalars().first()
-    if not db_zone:
+    old_email = (await db.execute(select(Zone.zone_email).filter(Zone.code == code))).one_or_none()
+    if old_email is None:
         raise HTTPException(status_code=404, detail="Zone not found")
+    old_email = old_email.zone_email
     
-    old_email = db_zone.zone_email
-    
-    update_data = zone_in.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_zone, field, value)
-    
-    db.add(db_zone)
-    await db.commit()
-    await db.refresh(db_zone)
+    update_data = zone_in.model_dump(exclude_unset=True)
+    if update_data:
+        result = await db.execute(
+            update(Zone).where(Zone.code == code).values(**update_data).returning(Zone)
+        )
+        db_zone = result.scalar_one()
+    else:
+        db_zone = (await db.execute(select(Zone).filter(Zone.code == code))).scalar_one()
     
     # Auto-create user if email is newly set or changed
     new_email = update_data.get("zone_email")
     if new_email and new_email != old_email:
         await _create_or_update_zone_user(db, db_zone.code, db_zone.name, new_email, background_tasks)
-        await db.commit()
+    await db.commit()
     
     if current_user.role != UserRole.ADMIN.value:
         try:
@@ -494,13 +566,10 @@ async def delete_zone(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    result = await db.execute(select(Zone).filter(Zone.code == code))
-    db_zone = result.scalars().first()
-    if not db_zone:
+    result = await db.execute(delete(Zone).where(Zone.code == code).returning(Zone.name))
+    zone_name = result.scalar_one_or_none()
+    if zone_name is None:
         raise HTTPException(status_code=404, detail="Zone not found")
-    
-    zone_name = db_zone.name
-    await db.delete(db_zone)
     await db.commit()
     
     if current_user.role != UserRole.ADMIN.value:
@@ -512,22 +581,22 @@ async def delete_zone(
     return None
 
 # --- LGAs ---
-@router.get("/lgas", response_model=List[schemas.LGA])
+@router.get("/lgas", response_model=List[schemas.LGA], response_class=ORJSONResponse, response_model_exclude_none=True)
 async def get_lgas(
     state_code: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
-    query = select(LGA)
+    query = select(*_LGA_COLS)
     if current_user.role == UserRole.STATE.value:
         query = query.filter(LGA.state_code == current_user.state_code)
     elif current_user.role == UserRole.ZONE.value:
-        query = query.join(State).filter(State.zone_code == current_user.zone_code)
+        query = query.join(State, LGA.state_code == State.code).filter(State.zone_code == current_user.zone_code)
     elif state_code:
         query = query.filter(LGA.state_code == state_code)
-    result = await db.execute(query)
-    return result.scalars().all()
+    rows = (await db.execute(query)).mappings()
+    return [schemas.LGA.model_construct(**row) for row in rows]
 
 @router.get("/lgas/{code}", response_model=schemas.LGA)
 async def get_lga(
@@ -558,10 +627,9 @@ async def create_lga(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    db_lga = LGA(**lga.dict())
+    db_lga = LGA(**lga.model_dump())
     db.add(db_lga)
     await db.commit()
-    await db.refresh(db_lga)
     
     if current_user.role != UserRole.ADMIN.value:
         try:
@@ -579,18 +647,17 @@ async def update_lga(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    result = await db.execute(select(LGA).filter(LGA.code == code))
-    db_lga = result.scalars().first()
-    if not db_lga:
+    update_data = lga_in.model_dump(exclude_unset=True)
+    if update_data:
+        result = await db.execute(
+            update(LGA).where(LGA.code == code).values(**update_data).returning(LGA)
+        )
+        db_lga = result.scalar_one_or_none()
+    else:
+        db_lga = (await db.execute(select(LGA).filter(LGA.code == code))).scalar_one_or_none()
+    if db_lga is None:
         raise HTTPException(status_code=404, detail="LGA not found")
-    
-    update_data = lga_in.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_lga, field, value)
-    
-    db.add(db_lga)
     await db.commit()
-    await db.refresh(db_lga)
     
     if current_user.role != UserRole.ADMIN.value:
         try:
@@ -607,13 +674,10 @@ async def delete_lga(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    result = await db.execute(select(LGA).filter(LGA.code == code))
-    db_lga = result.scalars().first()
-    if not db_lga:
+    result = await db.execute(delete(LGA).where(LGA.code == code).returning(LGA.name))
+    lga_name = result.scalar_one_or_none()
+    if lga_name is None:
         raise HTTPException(status_code=404, detail="LGA not found")
-    
-    lga_name = db_lga.name
-    await db.delete(db_lga)
     await db.commit()
     
     if current_user.role != UserRole.ADMIN.value:
@@ -625,7 +689,7 @@ async def delete_lga(
     return None
 
 # --- Custodians ---
-@router.get("/custodians", response_model=List[schemas.Custodian])
+@router.get("/custodians", response_model=List[schemas.Custodian], response_class=ORJSONResponse, response_model_exclude_none=True)
 async def get_custodians(
     state_code: Optional[str] = None,
     lga_code: Optional[str] = None,
@@ -633,19 +697,19 @@ async def get_custodians(
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
-    query = select(Custodian)
+    query = select(*_CUSTODIAN_COLS)
     if current_user.role == UserRole.STATE.value:
         query = query.filter(Custodian.state_code == current_user.state_code)
     elif current_user.role == UserRole.ZONE.value:
-        query = query.join(State).filter(State.zone_code == current_user.zone_code)
+        query = query.join(State, Custodian.state_code == State.code).filter(State.zone_code == current_user.zone_code)
     elif state_code:
         query = query.filter(Custodian.state_code == state_code)
     
     if lga_code:
         query = query.filter(Custodian.lga_code == lga_code)
         
-    result = await db.execute(query)
-    return result.scalars().all()
+    rows = (await db.execute(query)).mappings()
+    return [schemas.Custodian.model_construct(**row) for row in rows]
 
 @router.get("/custodians/{code}", response_model=schemas.Custodian)
 async def get_custodian(
@@ -671,7 +735,7 @@ async def create_custodian(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ, UserRole.STATE])),
     request: Request = None
 ):
-    custodian_data = custodian.dict()
+    custodian_data = custodian.model_dump()
     if current_user.role == UserRole.STATE.value:
         custodian_data['state_code'] = current_user.state_code
     for key in ['state_code', 'lga_code']:
@@ -682,7 +746,6 @@ async def create_custodian(
     db_custodian = Custodian(**custodian_data)
     db.add(db_custodian)
     await db.commit()
-    await db.refresh(db_custodian)
     
     if current_user.role != UserRole.ADMIN.value:
         try:
@@ -700,26 +763,29 @@ async def update_custodian(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ, UserRole.STATE])),
     request: Request = None
 ):
-    result = await db.execute(select(Custodian).filter(Custodian.code == code))
-    db_custodian = result.scalars().first()
-    if not db_custodian:
+    current_state_code = (await db.execute(select(Custodian.state_code).filter(Custodian.code == code))).one_or_none()
+    if current_state_code is None:
         raise HTTPException(status_code=404, detail="Custodian not found")
         
-    if current_user.role == UserRole.STATE.value and db_custodian.state_code != current_user.state_code:
+    if current_user.role == UserRole.STATE.value and current_state_code.state_code != current_user.state_code:
         raise HTTPException(status_code=403, detail="Permission denied")
     
-    update_data = custodian_in.dict(exclude_unset=True)
+    update_data = custodian_in.model_dump(exclude_unset=True)
     if current_user.role == UserRole.STATE.value and "state_code" in update_data:
         del update_data["state_code"]
-    for field, value in update_data.items():
-        if field in ["state_code", "lga_code"]:
-            if value == "" or value == "null" or value == "undefined" or (isinstance(value, str) and not value.strip()):
-                value = None
-        setattr(db_custodian, field, value)
+    for field in ["state_code", "lga_code"]:
+        value = update_data.get(field)
+        if value == "" or value == "null" or value == "undefined" or (isinstance(value, str) and not value.strip()):
+            update_data[field] = None
     
-    db.add(db_custodian)
+    if update_data:
+        result = await db.execute(
+            update(Custodian).where(Custodian.code == code).values(**update_data).returning(Custodian)
+        )
+        db_custodian = result.scalar_one()
+    else:
+        db_custodian = (await db.execute(select(Custodian).filter(Custodian.code == code))).scalar_one()
     await db.commit()
-    await db.refresh(db_custodian)
     
     if current_user.role != UserRole.ADMIN.value:
         try:
@@ -736,13 +802,10 @@ async def delete_custodian(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    result = await db.execute(select(Custodian).filter(Custodian.code == code))
-    db_custodian = result.scalars().first()
-    if not db_custodian:
+    result = await db.execute(delete(Custodian).where(Custodian.code == code).returning(Custodian.name))
+    custodian_name = result.scalar_one_or_none()
+    if custodian_name is None:
         raise HTTPException(status_code=404, detail="Custodian not found")
-    
-    custodian_name = db_custodian.name
-    await db.delete(db_custodian)
     await db.commit()
     
     if current_user.role != UserRole.ADMIN.value:
@@ -754,7 +817,7 @@ async def delete_custodian(
     return None
     
 # --- BECE Custodians ---
-@router.get("/bece-custodians", response_model=List[schemas.BECECustodian])
+@router.get("/bece-custodians", response_model=List[schemas.BECECustodian], response_class=ORJSONResponse, response_model_exclude_none=True)
 async def get_bece_custodians(
     state_code: Optional[str] = None,
     lga_code: Optional[str] = None,
@@ -762,19 +825,19 @@ async def get_bece_custodians(
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
-    query = select(BECECustodian)
+    query = select(*_BECE_CUSTODIAN_COLS)
     if current_user.role == UserRole.STATE.value:
         query = query.filter(BECECustodian.state_code == current_user.state_code)
     elif current_user.role == UserRole.ZONE.value:
-        query = query.join(State).filter(State.zone_code == current_user.zone_code)
+        query = query.join(State, BECECustodian.state_code == State.code).filter(State.zone_code == current_user.zone_code)
     elif state_code:
         query = query.filter(BECECustodian.state_code == state_code)
     
     if lga_code:
         query = query.filter(BECECustodian.lga_code == lga_code)
         
-    result = await db.execute(query)
-    return result.scalars().all()
+    rows = (await db.execute(query)).mappings()
+    return [schemas.BECECustodian.model_construct(**row) for row in rows]
 
 @router.get("/bece-custodians/{code}", response_model=schemas.BECECustodian)
 async def get_bece_custodian(
@@ -800,7 +863,7 @@ async def create_bece_custodian(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ, UserRole.STATE])),
     request: Request = None
 ):
-    custodian_data = custodian.dict()
+    custodian_data = custodian.model_dump()
     if current_user.role == UserRole.STATE.value:
         custodian_data['state_code'] = current_user.state_code
     for key in ['state_code', 'lga_code']:
@@ -811,7 +874,6 @@ async def create_bece_custodian(
     db_custodian = BECECustodian(**custodian_data)
     db.add(db_custodian)
     await db.commit()
-    await db.refresh(db_custodian)
     
     if current_user.role != UserRole.ADMIN.value:
         try:
@@ -829,26 +891,29 @@ async def update_bece_custodian(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ, UserRole.STATE])),
     request: Request = None
 ):
-    result = await db.execute(select(BECECustodian).filter(BECECustodian.code == code))
-    db_custodian = result.scalars().first()
-    if not db_custodian:
+    current_state_code = (await db.execute(select(BECECustodian.state_code).filter(BECECustodian.code == code))).one_or_none()
+    if current_state_code is None:
         raise HTTPException(status_code=404, detail="BECE Custodian not found")
         
-    if current_user.role == UserRole.STATE.value and db_custodian.state_code != current_user.state_code:
+    if current_user.role == UserRole.STATE.value and current_state_code.state_code != current_user.state_code:
         raise HTTPException(status_code=403, detail="Permission denied")
     
-    update_data = custodian_in.dict(exclude_unset=True)
+    update_data = custodian_in.model_dump(exclude_unset=True)
     if current_user.role == UserRole.STATE.value and "state_code" in update_data:
         del update_data["state_code"]
-    for field, value in update_data.items():
-        if field in ["state_code", "lga_code"]:
-            if value == "" or value == "null" or value == "undefined" or (isinstance(value, str) and not value.strip()):
-                value = None
-        setattr(db_custodian, field, value)
+    for field in ["state_code", "lga_code"]:
+        value = update_data.get(field)
+        if value == "" or value == "null" or value == "undefined" or (isinstance(value, str) and not value.strip()):
+            update_data[field] = None
     
-    db.add(db_custodian)
+    if update_data:
+        result = await db.execute(
+            update(BECECustodian).where(BECECustodian.code == code).values(**update_data).returning(BECECustodian)
+        )
+        db_custodian = result.scalar_one()
+    else:
+        db_custodian = (await db.execute(select(BECECustodian).filter(BECECustodian.code == code))).scalar_one()
     await db.commit()
-    await db.refresh(db_custodian)
     
     if current_user.role != UserRole.ADMIN.value:
         try:
@@ -865,13 +930,10 @@ async def delete_bece_custodian(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    result = await db.execute(select(BECECustodian).filter(BECECustodian.code == code))
-    db_custodian = result.scalars().first()
-    if not db_custodian:
+    result = await db.execute(delete(BECECustodian).where(BECECustodian.code == code).returning(BECECustodian.name))
+    custodian_name = result.scalar_one_or_none()
+    if custodian_name is None:
         raise HTTPException(status_code=404, detail="BECE Custodian not found")
-    
-    custodian_name = db_custodian.name
-    await db.delete(db_custodian)
     await db.commit()
     
     if current_user.role != UserRole.ADMIN.value:
@@ -887,13 +949,12 @@ async def delete_all_bece_custodians(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
 ):
-    from sqlalchemy import delete
     await db.execute(delete(BECECustodian))
     await db.commit()
     return None
 
 # --- Schools ---
-@router.get("/schools", response_model=List[schemas.School])
+@router.get("/schools", response_model=List[schemas.School], response_class=ORJSONResponse, response_model_exclude_none=True)
 async def get_schools(
     state_code: Optional[str] = None,
     lga_code: Optional[str] = None,
@@ -903,13 +964,13 @@ async def get_schools(
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
-    query = select(School)
+    query = select(*_SCHOOL_COLS)
     
     # State/Zone user constraint
     if current_user.role == UserRole.STATE.value:
         query = query.filter(School.state_code == current_user.state_code)
     elif current_user.role == UserRole.ZONE.value:
-        query = query.join(State).filter(State.zone_code == current_user.zone_code)
+        query = query.join(State, School.state_code == State.code).filter(State.zone_code == current_user.zone_code)
     elif state_code:
         query = query.filter(School.state_code == state_code)
         
@@ -920,8 +981,8 @@ async def get_schools(
     if accrd_year:
         query = query.filter(School.accrd_year == accrd_year)
         
-    result = await db.execute(query)
-    return result.scalars().all()
+    rows = (await db.execute(query)).mappings()
+    return [schemas.School.model_construct(**row) for row in rows]
 
 @router.delete("/schools/all", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_all_schools(
@@ -929,11 +990,12 @@ async def delete_all_schools(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
 ):
-    from sqlalchemy import delete
-    stmt = delete(School)
     if accrd_year:
-        stmt = stmt.where(School.accrd_year == accrd_year)
-    await db.execute(stmt)
+        await db.execute(delete(School).where(School.accrd_year == accrd_year))
+    else:
+        # TRUNCATE reclaims space immediately instead of row-by-row deletes;
+        # nothing references schools, so no CASCADE is needed
+        await db.execute(text("TRUNCATE TABLE schools"))
     await db.commit()
     return None
 
@@ -973,7 +1035,7 @@ async def create_school(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ, UserRole.STATE])),
     request: Request = None
 ):
-    school_data = school.dict()
+    school_data = school.model_dump()
     if current_user.role == UserRole.STATE.value:
         school_data['state_code'] = current_user.state_code
     for key in ['state_code', 'lga_code', 'custodian_code']:
@@ -984,20 +1046,28 @@ async def create_school(
     if not school_data.get("accreditation_type"):
         school_data["accreditation_type"] = AccreditationType.FRESH.value
 
-    from app.infrastructure.database.models import AccreditationStatus
     if school_data.get("accreditation_status") == AccreditationStatus.ACCREDITED.value:
         if not school_data.get("accredited_date"):
-            from datetime import datetime
-            school_data["accredited_date"] = datetime.now().isoformat()
-
-    db_school = School(**school_data)
-    db.add(db_school)
+            school_data["accredited_date"] = _accredited_date_now()
+
+    # Defer accrd_year to the server default when the client omits it
+    if school_data.get("accrd_year") is None:
+        school_data.pop("accrd_year", None)
+
+    stmt = (
+        pg_insert(School)
+        .values(**school_data)
+        .on_conflict_do_update(
+            index_elements=[School.code, School.accrd_year],
+            set_={key: value for key, value in school_data.items() if key not in ("code", "accrd_year")},
+        )
+        .returning(School)
+    )
+    db_school = (await db.execute(stmt)).scalar_one()
     await db.commit()
-    await db.refresh(db_school)
     
     # Send initial notification instead of credentials
     if school.email:
-        from datetime import datetime
         
         # Prepare recipients
         recipients = [school.email]
@@ -1030,48 +1100,48 @@ async def update_school(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ, UserRole.STATE])),
     request: Request = None
 ):
-    query = select(School).filter(School.code == code)
+    query = select(School.accrd_year, School.state_code, School.email, School.accredited_date).filter(School.code == code)
     if accrd_year:
         query = query.filter(School.accrd_year == accrd_year)
     else:
         query = query.order_by(School.accrd_year.desc())
-    result = await db.execute(query)
-    db_school = result.scalars().first()
-    if not db_school:
+    current_row = (await db.execute(query)).first()
+    if current_row is None:
         raise HTTPException(status_code=404, detail="School not found")
-    
     # RBAC: State user can only update schools in their state
-    if current_user.role == UserRole.STATE.value and db_school.state_code != current_user.state_code:
+    if current_user.role == UserRole.STATE.value and current_row.state_code != current_user.state_code:
         raise HTTPException(status_code=403, detail="Permission denied")
     
-    old_email = db_school.email
-    update_data = school_in.dict(exclude_unset=True)
+    old_email = current_row.email
+    update_data = school_in.model_dump(exclude_unset=True)
     if current_user.role == UserRole.STATE.value and "state_code" in update_data:
         del update_data["state_code"]
 
-    # Handle accreditation date logic
-    from app.infrastructure.database.models import AccreditationStatus
+    # Handle accreditation date logic; if changed to Accredited with no
+    # date provided, stamp today
     if "accreditation_status" in update_data:
         if update_data["accreditation_status"] == AccreditationStatus.ACCREDITED.value:
-            # If changed to Accredited and no date provided, set to today
-            if not update_data.get("accredited_date") and not db_school.accredited_date:
-                from datetime import datetime
-                update_data["accredited_date"] = datetime.now().isoformat()
+            if not update_data.get("accredited_date") and not current_row.accredited_date:
+                    update_data["accredited_date"] = _accredited_date_now()
     
-    for field, value in update_data.items():
-        if field in ["state_code", "lga_code", "custodian_code"]:
-            if value == "" or value == "null" or value == "undefined" or (isinstance(value, str) and not value.strip()):
-                value = None
-        setattr(db_school, field, value)
+    for field in ["state_code", "lga_code", "custodian_code"]:
+        value = update_data.get(field)
+        if value == "" or value == "null" or value == "undefined" or (isinstance(value, str) and not value.strip()):
+            update_data[field] = None
     
-    db.add(db_school)
+    target = (School.code == code, School.accrd_year == current_row.accrd_year)
+    if update_data:
+        result = await db.execute(
+            update(School).where(*target).values(**update_data).returning(School)
+        )
+        db_school = result.scalar_one()
+    else:
+        db_school = (await db.execute(select(School).filter(*target))).scalar_one()
     await db.commit()
-    await db.refresh(db_school)
     
     # Send notification if email is newly set or changed (instead of credentials)
     new_email = update_data.get("email")
     if new_email and new_email != old_email:
-        from datetime import datetime
         
         # Prepare recipients
         recipients = [new_email]
@@ -1115,7 +1185,6 @@ async def approve_school(
     db_school.approval_status = "Approved"
     db.add(db_school)
     await db.commit()
-    await db.refresh(db_school)
     
     try:
         await log_activity(
@@ -1211,18 +1280,17 @@ async def delete_school(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    query = select(School).filter(School.code == code)
+    stmt = delete(School).where(School.code == code)
     if accrd_year:
-        query = query.filter(School.accrd_year == accrd_year)
+        stmt = stmt.where(School.accrd_year == accrd_year)
     else:
-        query = query.order_by(School.accrd_year.desc())
-    result = await db.execute(query)
-    db_school = result.scalars().first()
-    if not db_school:
+        # Only remove the most recent year, matching the lookup behaviour
+        latest_year = select(func.max(School.accrd_year)).where(School.code == code).scalar_subquery()
+        stmt = stmt.where(School.accrd_year == latest_year)
+    result = await db.execute(stmt.returning(School.name))
+    school_name = result.scalar_one_or_none()
+    if school_name is None:
         raise HTTPException(status_code=404, detail="School not found")
-    
-    school_name = db_school.name
-    await db.delete(db_school)
     await db.commit()
     
     if current_user.role != UserRole.ADMIN.value:
@@ -1265,7 +1333,6 @@ async def upload_school_payment_proof(
     school.payment_url = f"/payment-proof/{filename}"
     db.add(school)
     await db.commit()
-    await db.refresh(school)
     return school
 
 @router.post("/bece-schools/{code}/upload-payment-proof", response_model=schemas.BECESchool)
@@ -1300,7 +1367,6 @@ async def upload_bece_school_payment_proof(
     school.payment_url = f"/payment-proof/{filename}"
     db.add(school)
     await db.commit()
-    await db.refresh(school)
     return school
 
 
@@ -1310,7 +1376,6 @@ async def delete_all_custodians(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
 ):
-    from sqlalchemy import delete
     await db.execute(delete(Custodian))
     await db.commit()
     return None
@@ -1320,13 +1385,12 @@ async def delete_all_lgas(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
 ):
-    from sqlalchemy import delete
     await db.execute(delete(LGA))
     await db.commit()
     return None
 
 # --- BECE Schools ---
-@router.get("/bece-schools", response_model=List[schemas.BECESchool])
+@router.get("/bece-schools", response_model=List[schemas.BECESchool], response_class=ORJSONResponse, response_model_exclude_none=True)
 async def get_bece_schools(
     state_code: Optional[str] = None,
     lga_code: Optional[str] = None,
@@ -1336,11 +1400,11 @@ async def get_bece_schools(
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
-    query = select(BECESchool)
+    query = select(*_BECE_SCHOOL_COLS)
     if current_user.role == UserRole.STATE.value:
         query = query.filter(BECESchool.state_code == current_user.state_code)
     elif current_user.role == UserRole.ZONE.value:
-        query = query.join(State).filter(State.zone_code == current_user.zone_code)
+        query = query.join(State, BECESchool.state_code == State.code).filter(State.zone_code == current_user.zone_code)
     elif state_code:
         query = query.filter(BECESchool.state_code == state_code)
         
@@ -1351,8 +1415,8 @@ async def get_bece_schools(
     if accrd_year:
         query = query.filter(BECESchool.accrd_year == accrd_year)
         
-    result = await db.execute(query)
-    return result.scalars().all()
+    rows = (await db.execute(query)).mappings()
+    return [schemas.BECESchool.model_construct(**row) for row in rows]
 
 @router.delete("/bece-schools/all", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_all_bece_schools(
@@ -1360,11 +1424,12 @@ async def delete_all_bece_schools(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
 ):
-    from sqlalchemy import delete
-    stmt = delete(BECESchool)
     if accrd_year:
-        stmt = stmt.where(BECESchool.accrd_year == accrd_year)
-    await db.execute(stmt)
+        await db.execute(delete(BECESchool).where(BECESchool.accrd_year == accrd_year))
+    else:
+        # TRUNCATE reclaims space immediately instead of row-by-row deletes;
+        # nothing references bece_schools, so no CASCADE is needed
+        await db.execute(text("TRUNCATE TABLE bece_schools"))
     await db.commit()
     return None
 
@@ -1404,7 +1469,7 @@ async def create_bece_school(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ, UserRole.STATE])),
     request: Request = None
 ):
-    school_data = school.dict()
+    school_data = school.model_dump()
     if current_user.role == UserRole.STATE.value:
         school_data['state_code'] = current_user.state_code
     for key in ['state_code', 'lga_code', 'custodian_code']:
@@ -1415,20 +1480,28 @@ async def create_bece_school(
     if not school_data.get("accreditation_type"):
         school_data["accreditation_type"] = AccreditationType.FRESH.value
 
-    from app.infrastructure.database.models import AccreditationStatus
     if school_data.get("accreditation_status") == AccreditationStatus.ACCREDITED.value:
         if not school_data.get("accredited_date"):
-            from datetime import datetime
-            school_data["accredited_date"] = datetime.now().isoformat()
-
-    db_school = BECESchool(**school_data)
-    db.add(db_school)
+            school_data["accredited_date"] = _accredited_date_now()
+
+    # Defer accrd_year to the server default when the client omits it
+    if school_data.get("accrd_year") is None:
+        school_data.pop("accrd_year", None)
+
+    stmt = (
+        pg_insert(BECESchool)
+        .values(**school_data)
+        .on_conflict_do_update(
+            index_elements=[BECESchool.code, BECESchool.accrd_year],
+            set_={key: value for key, value in school_data.items() if key not in ("code", "accrd_year")},
+        )
+        .returning(BECESchool)
+    )
+    db_school = (await db.execute(stmt)).scalar_one()
     await db.commit()
-    await db.refresh(db_school)
     
     # Send initial notification instead of credentials
     if school.email:
-        from datetime import datetime
         
         # Prepare recipients
         recipients = [school.email]
@@ -1461,45 +1534,45 @@ async def update_bece_school(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ, UserRole.STATE])),
     request: Request = None
 ):
-    query = select(BECESchool).filter(BECESchool.code == code)
+    query = select(BECESchool.accrd_year, BECESchool.state_code, BECESchool.email, BECESchool.accredited_date).filter(BECESchool.code == code)
     if accrd_year:
         query = query.filter(BECESchool.accrd_year == accrd_year)
     else:
         query = query.order_by(BECESchool.accrd_year.desc())
-    result = await db.execute(query)
-    db_school = result.scalars().first()
-    if not db_school:
+    current_row = (await db.execute(query)).first()
+    if current_row is None:
         raise HTTPException(status_code=404, detail="BECE School not found")
-    
-    if current_user.role == UserRole.STATE.value and db_school.state_code != current_user.state_code:
+    if current_user.role == UserRole.STATE.value and current_row.state_code != current_user.state_code:
         raise HTTPException(status_code=403, detail="Permission denied")
     
-    old_email = db_school.email
-    update_data = school_in.dict(exclude_unset=True)
+    old_email = current_row.email
+    update_data = school_in.model_dump(exclude_unset=True)
     if current_user.role == UserRole.STATE.value and "state_code" in update_data:
         del update_data["state_code"]
 
-    from app.infrastructure.database.models import AccreditationStatus
     if "accreditation_status" in update_data:
         if update_data["accreditation_status"] == AccreditationStatus.ACCREDITED.value:
-            if not update_data.get("accredited_date") and not db_school.accredited_date:
-                from datetime import datetime
-                update_data["accredited_date"] = datetime.now().isoformat()
+            if not update_data.get("accredited_date") and not current_row.accredited_date:
+                    update_data["accredited_date"] = _accredited_date_now()
     
-    for field, value in update_data.items():
-        if field in ["state_code", "lga_code", "custodian_code"]:
-            if value == "" or value == "null" or value == "undefined" or (isinstance(value, str) and not value.strip()):
-                value = None
-        setattr(db_school, field, value)
+    for field in ["state_code", "lga_code", "custodian_code"]:
+        value = update_data.get(field)
+        if value == "" or value == "null" or value == "undefined" or (isinstance(value, str) and not value.strip()):
+            update_data[field] = None
     
-    db.add(db_school)
+    target = (BECESchool.code == code, BECESchool.accrd_year == current_row.accrd_year)
+    if update_data:
+        result = await db.execute(
+            update(BECESchool).where(*target).values(**update_data).returning(BECESchool)
+        )
+        db_school = result.scalar_one()
+    else:
+        db_school = (await db.execute(select(BECESchool).filter(*target))).scalar_one()
     await db.commit()
-    await db.refresh(db_school)
     
     # Send notification if email is newly set or changed (instead of credentials)
     new_email = update_data.get("email")
     if new_email and new_email != old_email:
-        from datetime import datetime
         
         # Prepare recipients
         recipients = [new_email]
@@ -1543,7 +1616,6 @@ async def approve_bece_school(
     db_bece_school.approval_status = "Approved"
     db.add(db_bece_school)
     await db.commit()
-    await db.refresh(db_bece_school)
     
     try:
         await log_activity(
@@ -1639,18 +1711,17 @@ async def delete_bece_school(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    query = select(BECESchool).filter(BECESchool.code == code)
+    stmt = delete(BECESchool).where(BECESchool.code == code)
     if accrd_year:
-        query = query.filter(BECESchool.accrd_year == accrd_year)
+        stmt = stmt.where(BECESchool.accrd_year == accrd_year)
     else:
-        query = query.order_by(BECESchool.accrd_year.desc())
-    result = await db.execute(query)
-    db_school = result.scalars().first()
-    if not db_school:
+        # Only remove the most recent year, matching the lookup behaviour
+        latest_year = select(func.max(BECESchool.accrd_year)).where(BECESchool.code == code).scalar_subquery()
+        stmt = stmt.where(BECESchool.accrd_year == latest_year)
+    result = await db.execute(stmt.returning(BECESchool.name))
+    school_name = result.scalar_one_or_none()
+    if school_name is None:
         raise HTTPException(status_code=404, detail="BECE School not found")
-    
-    school_name = db_school.name
-    await db.delete(db_school)
     await db.commit()
     
     if current_user.role != UserRole.ADMIN.value:
@@ -1661,19 +1732,11 @@ async def delete_bece_school(
     
     return None
 
-    from sqlalchemy import delete
-    await db.execute(delete(User).filter(User.role == UserRole.STATE.value)) # Delete associated state users too
-    from sqlalchemy import delete
-    await db.execute(delete(State))
-    await db.commit()
-    return None
-
 @router.delete("/zones/all", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_all_zones(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
 ):
-    from sqlalchemy import delete
     await db.execute(delete(Zone))
     await db.commit()
     return None
@@ -1793,6 +1856,7 @@ async def duplicate_schools_for_year(
 @router.post("/schools/send-manual-emails")
 async def send_manual_emails(
     request_data: schemas.ManualEmailRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
@@ -1800,6 +1864,10 @@ async def send_manual_emails(
     """
     Manually send accreditation alerts to selected schools.
     """
+    # One bulk fetch of state emails instead of a State query per school
+    state_result = await db.execute(select(State.code, State.email))
+    state_emails = dict(state_result.all())
+
     results = []
     for item in request_data.schools:
         model = School if item.type == "SSCE" else BECESchool
@@ -1818,40 +1886,34 @@ async def send_manual_emails(
             results.append({"code": item.code, "status": "failed", "detail": "School has no accredited date"})
             continue
             
-        try:
-            # Prepare recipients
-            recipients = [school.email]
-            
-            # Add state email if available
-            state_result = await db.execute(select(State).filter(State.code == school.state_code))
-            state = state_result.scalars().first()
-            if state and state.email:
-                recipients.append(state.email)
-            
-            # Send the alert
-            success = send_accreditation_alert(
-                to_emails=recipients,
-                school_name=school.name
-            )
-            
-            if success:
-                results.append({"code": item.code, "status": "success"})
-                # Audit log
-                await log_activity(
-                    db=db,
-                    user_id=current_user.id,
-                    user_role=current_user.role,
-                    action=AuditAction.UPDATE,
-                    resource_type=AuditResource.SCHOOL,
-                    resource_id=school.code,
-                    details=f"Manually sent accreditation alert to {school.name}",
-                    ip_address=request.client.host if request else None
-                )
-            else:
-                results.append({"code": item.code, "status": "failed", "detail": "Failed to send email"})
-                
-        except Exception as e:
-            results.append({"code": item.code, "status": "failed", "detail": str(e)})
+        # Prepare recipients
+        recipients = [school.email]
+
+        # Add state email if available
+        state_email = state_emails.get(school.state_code)
+        if state_email:
+            recipients.append(state_email)
+
+        # Queue the alert so the SMTP round-trips happen after the response,
+        # like the credential emails sent by the state/zone user helpers
+        background_tasks.add_task(
+            send_accreditation_alert,
+            to_emails=recipients,
+            school_name=school.name
+        )
+        results.append({"code": item.code, "status": "queued"})
+
+        # Audit log
+        await log_activity(
+            db=db,
+            user_id=current_user.id,
+            user_role=current_user.role,
+            action=AuditAction.UPDATE,
+            resource_type=AuditResource.SCHOOL,
+            resource_id=school.code,
+            details=f"Queued accreditation alert for {school.name}",
+            ip_address=request.client.host if request else None
+        )
 
     await db.commit()
     return {"message": "Email processing complete", "results": results}
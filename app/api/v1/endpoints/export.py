@@ -1,19 +1,88 @@
 from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.infrastructure.database.session import get_db
 from app.infrastructure.database.models import School, User, UserRole, LGA, Custodian, State, BECESchool
 from app.core.auth import get_current_user
 from app.core.audit_logger import log_activity, AuditAction, AuditResource
-import pandas as pd
+import csv
 import dbf
 import tempfile
 import os
-from fastapi.responses import StreamingResponse
+import shutil
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from openpyxl import Workbook
 import io
 
 router = APIRouter()
 
+# Column projections and CSV headers per exported entity
+_SCHOOL_EXPORT_COLS = (School.code, School.name, School.state_code, School.lga_code, School.custodian_code, School.category, School.accrd_year, School.approval_status, School.gender, School.status)
+_SCHOOL_EXPORT_HEADERS = ("code", "name", "state_code", "lga_code", "custodian_code", "category", "accrd_year", "approval_status", "gender", "status")
+_BECE_SCHOOL_EXPORT_COLS = (BECESchool.code, BECESchool.name, BECESchool.state_code, BECESchool.lga_code, BECESchool.custodian_code, BECESchool.category, BECESchool.accrd_year, BECESchool.approval_status, BECESchool.gender, BECESchool.status)
+_LGA_EXPORT_COLS = (LGA.code, LGA.name, LGA.state_code)
+_LGA_EXPORT_HEADERS = ("code", "name", "state_code")
+_CUSTODIAN_EXPORT_COLS = (Custodian.code, Custodian.name, Custodian.state_code, Custodian.lga_code, Custodian.town, Custodian.status)
+_CUSTODIAN_EXPORT_HEADERS = ("code", "name", "state_code", "lga_code", "town", "status")
+def _dbf_field_lengths(schema):
+    """Parse the character widths out of a DBF schema string once, at import."""
+    return tuple(int(field[field.index("(") + 1:field.index(")")]) for field in schema.split(";"))
+
+
+# DBF schemas (FoxPro field names max 10 chars) and their field widths
+_SCHOOL_DBF_SCHEMA = "code C(10); name C(254); st_code C(10); lga_code C(10); cust_code C(10); category C(10); accrd_yr C(10); gender C(10); status C(10)"
+_SCHOOL_DBF_MAX_LENS = _dbf_field_lengths(_SCHOOL_DBF_SCHEMA)
+_LGA_DBF_SCHEMA = "code C(10); name C(254); st_code C(10)"
+_LGA_DBF_MAX_LENS = _dbf_field_lengths(_LGA_DBF_SCHEMA)
+_CUSTODIAN_DBF_SCHEMA = "code C(10); name C(254); st_code C(10); lga_code C(10); town C(254); status C(10)"
+_CUSTODIAN_DBF_MAX_LENS = _dbf_field_lengths(_CUSTODIAN_DBF_SCHEMA)
+
+# Positions of the school export columns that make it into the DBF file
+# (approval_status is dropped); the renames such as state_code -> st_code
+# live in the schema strings alone. LGA and custodian exports map 1:1.
+_SCHOOL_DBF_INDEXES = (0, 1, 2, 3, 4, 5, 6, 8, 9)
+
+_STATE_EXPORT_COLS = (State.code, State.name, State.capital, State.email, State.ministry_email, State.zone_code, State.status)
+_STATE_EXPORT_HEADERS = ("code", "name", "capital", "email", "ministry_email", "zone_code", "status")
+
+
+async def fetch_partitioned(db, query, size=1000):
+    """Materialize a query through a server-side cursor in fixed-size batches.
+
+    The Excel and DBF writers still need the full row list, but fetching it in
+    partitions keeps the driver from buffering the entire result set at once.
+    """
+    rows = []
+    result = await db.stream(query)
+    async for partition in result.partitions(size):
+        rows.extend(partition)
+    return rows
+
+
+def stream_csv(db, query, headers, filename):
+    """Stream a Core query out as CSV without materializing the result set."""
+    async def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(headers)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        result = await db.stream(query)
+        async for partition in result.partitions(1000):
+            writer.writerows(partition)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}.csv"}
+    )
+
 @router.get("/export/schools")
 async def export_schools(
     format: str = "excel", # excel, csv, dbf
@@ -22,71 +91,42 @@ async def export_schools(
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
-    query = select(School)
+    filters = []
     if current_user.role == UserRole.STATE.value:
-        query = query.filter(School.state_code == current_user.state_code)
+        filters.append(School.state_code == current_user.state_code)
     if accrd_year:
-        query = query.filter(School.accrd_year == accrd_year)
-    
-    result = await db.execute(query)
-    schools = result.scalars().all()
-    data = []
-    for s in schools:
-        data.append({
-            "code": s.code,
-            "name": s.name,
-            "state_code": s.state_code,
-            "lga_code": s.lga_code,
-            "custodian_code": s.custodian_code,
-            "category": s.category,
-            "accrd_year": s.accrd_year,
-            "approval_status": s.approval_status,
-            "gender": s.gender,
-            "status": s.status
-        })
+        filters.append(School.accrd_year == accrd_year)
     
+    # Logged before the fetch; the details no longer carry a row count so the
+    # CSV path can stream without counting first
     if current_user.role != UserRole.ADMIN.value:
         try:
-            await log_activity(db=db, user_id=current_user.id, user_role=current_user.role, action=AuditAction.EXPORT, resource_type=AuditResource.SCHOOL, details=f"Exported {len(schools)} schools as {format}", ip_address=request.client.host if request else None)
+            await log_activity(db=db, user_id=current_user.id, user_role=current_user.role, action=AuditAction.EXPORT, resource_type=AuditResource.SCHOOL, details=f"Exported schools as {format}", ip_address=request.client.host if request else None)
             await db.commit()
         except: pass
     
     if format == "csv":
-        return export_to_csv(data, "schools")
-    elif format == "dbf":
-        # FoxPro field names max 10 chars
-        dbf_data = []
-        for d in data:
-            dbf_data.append({
-                "code": d["code"],
-                "name": d["name"],
-                "st_code": d["state_code"],
-                "lga_code": d["lga_code"],
-                "cust_code": d["custodian_code"],
-                "category": d["category"],
-                "accrd_yr": d["accrd_year"],
-                "gender": d["gender"],
-                "status": d["status"]
-            })
-        schema = "code C(10); name C(254); st_code C(10); lga_code C(10); cust_code C(10); category C(10); accrd_yr C(10); gender C(10); status C(10)"
-        return export_to_dbf(dbf_data, "schools", schema)
+        return stream_csv(db, select(*_SCHOOL_EXPORT_COLS).filter(*filters), _SCHOOL_EXPORT_HEADERS, "schools")
     
-    return export_to_excel(data, "schools")
+    rows = await fetch_partitioned(db, select(*_SCHOOL_EXPORT_COLS).filter(*filters))
+    
+    if format == "dbf":
+        dbf_rows = [tuple(row[i] for i in _SCHOOL_DBF_INDEXES) for row in rows]
+        return await run_in_threadpool(export_to_dbf, dbf_rows, "schools", _SCHOOL_DBF_SCHEMA, _SCHOOL_DBF_MAX_LENS)
+    
+    return await run_in_threadpool(export_to_excel, rows, _SCHOOL_EXPORT_HEADERS, "schools")
 
 @router.get("/export/states")
 async def export_states(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    from app.infrastructure.database.models import State
-    query = select(State)
+    query = select(*_STATE_EXPORT_COLS)
     if current_user.role == UserRole.STATE.value:
         query = query.filter(State.code == current_user.state_code)
     
-    result = await db.execute(query)
-    states = result.scalars().all()
-    data = [{"code": s.code, "name": s.name, "capital": s.capital, "email": s.email, "ministry_email": s.ministry_email, "zone_code": s.zone_code, "status": s.status} for s in states]
-    return export_to_excel(data, "states")
+    rows = await fetch_partitioned(db, query)
+    return await run_in_threadpool(export_to_excel, rows, _STATE_EXPORT_HEADERS, "states")
 
 @router.get("/export/lgas")
 async def export_lgas(
@@ -94,22 +134,19 @@ async def export_lgas(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = select(LGA)
+    filters = []
     if current_user.role == UserRole.STATE.value:
-        query = query.filter(LGA.state_code == current_user.state_code)
-    
-    result = await db.execute(query)
-    lgas = result.scalars().all()
-    data = [{"code": l.code, "name": l.name, "state_code": l.state_code} for l in lgas]
+        filters.append(LGA.state_code == current_user.state_code)
     
     if format == "csv":
-        return export_to_csv(data, "lgas")
-    elif format == "dbf":
-        dbf_data = [{"code": d["code"], "name": d["name"], "st_code": d["state_code"]} for d in data]
-        schema = "code C(10); name C(254); st_code C(10)"
-        return export_to_dbf(dbf_data, "lgas", schema)
+        return stream_csv(db, select(*_LGA_EXPORT_COLS).filter(*filters), _LGA_EXPORT_HEADERS, "lgas")
+    
+    rows = await fetch_partitioned(db, select(*_LGA_EXPORT_COLS).filter(*filters))
+    
+    if format == "dbf":
+        return await run_in_threadpool(export_to_dbf, rows, "lgas", _LGA_DBF_SCHEMA, _LGA_DBF_MAX_LENS)
         
-    return export_to_excel(data, "lgas")
+    return await run_in_threadpool(export_to_excel, rows, _LGA_EXPORT_HEADERS, "lgas")
 
 @router.get("/export/custodians")
 async def export_custodians(
@@ -117,40 +154,19 @@ async def export_custodians(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = select(Custodian)
+    filters = []
     if current_user.role == UserRole.STATE.value:
-        query = query.filter(Custodian.state_code == current_user.state_code)
-    
-    result = await db.execute(query)
-    custodians = result.scalars().all()
-    data = []
-    for c in custodians:
-        data.append({
-            "code": c.code,
-            "name": c.name,
-            "state_code": c.state_code,
-            "lga_code": c.lga_code,
-            "town": c.town,
-            "status": c.status
-        })
+        filters.append(Custodian.state_code == current_user.state_code)
     
     if format == "csv":
-        return export_to_csv(data, "custodians")
-    elif format == "dbf":
-        dbf_data = []
-        for d in data:
-            dbf_data.append({
-                "code": d["code"],
-                "name": d["name"],
-                "st_code": d["state_code"],
-                "lga_code": d["lga_code"],
-                "town": d["town"],
-                "status": d["status"]
-            })
-        schema = "code C(10); name C(254); st_code C(10); lga_code C(10); town C(254); status C(10)"
-        return export_to_dbf(dbf_data, "custodians", schema)
+        return stream_csv(db, select(*_CUSTODIAN_EXPORT_COLS).filter(*filters), _CUSTODIAN_EXPORT_HEADERS, "custodians")
+    
+    rows = await fetch_partitioned(db, select(*_CUSTODIAN_EXPORT_COLS).filter(*filters))
+    
+    if format == "dbf":
+        return await run_in_threadpool(export_to_dbf, rows, "custodians", _CUSTODIAN_DBF_SCHEMA, _CUSTODIAN_DBF_MAX_LENS)
         
-    return export_to_excel(data, "custodians")
+    return await run_in_threadpool(export_to_excel, rows, _CUSTODIAN_EXPORT_HEADERS, "custodians")
 
 @router.get("/export/bece-custodians")
 async def export_bece_custodians(
@@ -160,46 +176,28 @@ async def export_bece_custodians(
     request: Request = None
 ):
     from app.infrastructure.database.models import BECECustodian
-    query = select(BECECustodian)
+    filters = []
     if current_user.role == UserRole.STATE.value:
-        query = query.filter(BECECustodian.state_code == current_user.state_code)
-    
-    result = await db.execute(query)
-    custodians = result.scalars().all()
-    data = []
-    for c in custodians:
-        data.append({
-            "code": c.code,
-            "name": c.name,
-            "state_code": c.state_code,
-            "lga_code": c.lga_code,
-            "town": c.town,
-            "status": c.status
-        })
+        filters.append(BECECustodian.state_code == current_user.state_code)
     
     if current_user.role != UserRole.ADMIN.value:
         try:
-            await log_activity(db=db, user_id=current_user.id, user_role=current_user.role, action=AuditAction.EXPORT, resource_type=AuditResource.BECE_CUSTODIAN, details=f"Exported {len(custodians)} BECE custodians as {format}", ip_address=request.client.host if request else None)
+            await log_activity(db=db, user_id=current_user.id, user_role=current_user.role, action=AuditAction.EXPORT, resource_type=AuditResource.BECE_CUSTODIAN, details=f"Exported BECE custodians as {format}", ip_address=request.client.host if request else None)
             await db.commit()
         except: pass
 
     if format == "csv":
-        return export_to_csv(data, "bece_custodians")
-    elif format == "dbf":
-        dbf_data = []
-        for d in data:
-            dbf_data.append({
-                "code": d["code"],
-                "name": d["name"],
-                "st_code": d["state_code"],
-                "lga_code": d["lga_code"],
-                "town": d["town"],
-                "status": d["status"]
-            })
-        schema = "code C(10); name C(254); st_code C(10); lga_code C(10); town C(254); status C(10)"
-        return export_to_dbf(dbf_data, "bece_custodians", schema)
+        return stream_csv(db, select(BECECustodian.code, BECECustodian.name, BECECustodian.state_code, BECECustodian.lga_code, BECECustodian.town, BECECustodian.status).filter(*filters), _CUSTODIAN_EXPORT_HEADERS, "bece_custodians")
+    
+    rows = await fetch_partitioned(
+        db,
+        select(BECECustodian.code, BECECustodian.name, BECECustodian.state_code, BECECustodian.lga_code, BECECustodian.town, BECECustodian.status).filter(*filters)
+    )
+    
+    if format == "dbf":
+        return await run_in_threadpool(export_to_dbf, rows, "bece_custodians", _CUSTODIAN_DBF_SCHEMA, _CUSTODIAN_DBF_MAX_LENS)
         
-    return export_to_excel(data, "bece_custodians")
+    return await run_in_threadpool(export_to_excel, rows, _CUSTODIAN_EXPORT_HEADERS, "bece_custodians")
 
 @router.get("/export/bece-schools")
 async def export_bece_schools(
@@ -209,121 +207,70 @@ async def export_bece_schools(
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
-    query = select(BECESchool)
+    filters = []
     if current_user.role == UserRole.STATE.value:
-        query = query.filter(BECESchool.state_code == current_user.state_code)
+        filters.append(BECESchool.state_code == current_user.state_code)
     if accrd_year:
-        query = query.filter(BECESchool.accrd_year == accrd_year)
-    
-    result = await db.execute(query)
-    schools = result.scalars().all()
-    data = []
-    for s in schools:
-        data.append({
-            "code": s.code,
-            "name": s.name,
-            "state_code": s.state_code,
-            "lga_code": s.lga_code,
-            "custodian_code": s.custodian_code,
-            "category": s.category,
-            "accrd_year": s.accrd_year,
-            "approval_status": s.approval_status,
-            "gender": s.gender,
-            "status": s.status
-        })
+        filters.append(BECESchool.accrd_year == accrd_year)
     
     if current_user.role != UserRole.ADMIN.value:
         try:
-            await log_activity(db=db, user_id=current_user.id, user_role=current_user.role, action=AuditAction.EXPORT, resource_type=AuditResource.BECE_SCHOOL, details=f"Exported {len(schools)} BECE schools as {format}", ip_address=request.client.host if request else None)
+            await log_activity(db=db, user_id=current_user.id, user_role=current_user.role, action=AuditAction.EXPORT, resource_type=AuditResource.BECE_SCHOOL, details=f"Exported BECE schools as {format}", ip_address=request.client.host if request else None)
             await db.commit()
         except: pass
     
     if format == "csv":
-        return export_to_csv(data, "bece_schools")
-    elif format == "dbf":
-        dbf_data = []
-        for d in data:
-            dbf_data.append({
-                "code": d["code"],
-                "name": d["name"],
-                "st_code": d["state_code"],
-                "lga_code": d["lga_code"],
-                "cust_code": d["custodian_code"],
-                "category": d["category"],
-                "accrd_yr": d["accrd_year"],
-                "gender": d["gender"],
-                "status": d["status"]
-            })
-        schema = "code C(10); name C(254); st_code C(10); lga_code C(10); cust_code C(10); category C(10); accrd_yr C(10); gender C(10); status C(10)"
-        return export_to_dbf(dbf_data, "bece_schools", schema)
+        return stream_csv(db, select(*_BECE_SCHOOL_EXPORT_COLS).filter(*filters), _SCHOOL_EXPORT_HEADERS, "bece_schools")
+    
+    rows = await fetch_partitioned(db, select(*_BECE_SCHOOL_EXPORT_COLS).filter(*filters))
     
-    return export_to_excel(data, "bece_schools")
+    if format == "dbf":
+        dbf_rows = [tuple(row[i] for i in _SCHOOL_DBF_INDEXES) for row in rows]
+        return await run_in_threadpool(export_to_dbf, dbf_rows, "bece_schools", _SCHOOL_DBF_SCHEMA, _SCHOOL_DBF_MAX_LENS)
+    
+    return await run_in_threadpool(export_to_excel, rows, _SCHOOL_EXPORT_HEADERS, "bece_schools")
 
-def export_to_excel(data, filename):
-    if not data:
-        df = pd.DataFrame()
-    else:
-        df = pd.DataFrame(data)
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False)
-    output.seek(0)
+def export_to_excel(rows, headers, filename):
+    # write_only mode keeps memory flat regardless of row count; the sheet is
+    # written to a temp file that FileResponse removes after sending
+    tmp = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False)
+    tmp.close()
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    for row in rows:
+        # Row objects aren't tuples; write-only append rejects them
+        sheet.append(tuple(row))
+    workbook.save(tmp.name)
     
-    return StreamingResponse(
-        output,
+    return FileResponse(
+        tmp.name,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}.xlsx"}
+        filename=f"{filename}.xlsx",
+        background=BackgroundTask(os.remove, tmp.name)
     )
 
-def export_to_csv(data, filename):
-    if not data:
-        df = pd.DataFrame()
-    else:
-        df = pd.DataFrame(data)
-    output = io.StringIO()
-    df.to_csv(output, index=False)
-    output.seek(0)
+def export_to_dbf(rows, filename, schema, field_lengths):
+    # Write into a scratch directory and hand the file path to FileResponse
+    # instead of reading the whole table back into memory; the directory is
+    # removed after the response is sent
+    tmpdir = tempfile.mkdtemp()
+    dbf_path = os.path.join(tmpdir, f"{filename}.dbf")
+    table = dbf.Table(dbf_path, schema, codepage='cp1252')
+    table.open(mode=dbf.READ_WRITE)
     
-    return StreamingResponse(
-        io.BytesIO(output.getvalue().encode('utf-8')),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}.csv"}
-    )
-
-def export_to_dbf(data, filename, schema):
-    # Use a temporary file for DBF creation
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dbf_path = os.path.join(tmpdir, f"{filename}.dbf")
-        table = dbf.Table(dbf_path, schema, codepage='cp1252')
-        table.open(mode=dbf.READ_WRITE)
-        
-        # Get field lengths for automatic truncation
-        field_lengths = {name: table.field_info(name).length for name in table.field_names}
-        
-        for row in data:
-            # Clean data: truncate strings that are too long for the field
-            # and handle None values
-            cleaned_row = {}
-            for k, v in row.items():
-                if v is None:
-                    cleaned_row[k] = ""
-                else:
-                    # DBF field names are uppercase in the table object
-                    field_name = k.upper()
-                    val_str = str(v)
-                    if field_name in field_lengths:
-                        max_len = field_lengths[field_name]
-                        if len(val_str) > max_len:
-                            val_str = val_str[:max_len]
-                    cleaned_row[k] = val_str
-            table.append(cleaned_row)
-        table.close()
-        
-        with open(dbf_path, "rb") as f:
-            content = f.read()
-            
-    return StreamingResponse(
-        io.BytesIO(content),
+    # Rows arrive as tuples already projected into schema order and are
+    # cleaned positionally against the precomputed field widths
+    for row in rows:
+        table.append(tuple(
+            "" if value is None else str(value)[:max_len]
+            for value, max_len in zip(row, field_lengths)
+        ))
+    table.close()
+    
+    return FileResponse(
+        dbf_path,
         media_type="application/x-dbf",
-        headers={"Content-Disposition": f"attachment; filename={filename}.dbf"}
+        filename=f"{filename}.dbf",
+        background=BackgroundTask(shutil.rmtree, tmpdir, ignore_errors=True)
     )
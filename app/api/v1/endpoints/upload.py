@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.infrastructure.database.session import get_db
-from app.infrastructure.database.models import School, BECESchool, Custodian, State, LGA, Zone, User, UserRole
+from sqlalchemy import insert, literal, select
+from app.infrastructure.database.session import bulk_insert, get_db
+from app.infrastructure.database.models import School, BECESchool, Custodian, BECECustodian, State, LGA, Zone, User, UserRole
 from app.core.auth import check_role
 from app.core.audit_logger import log_activity, AuditAction, AuditResource
 from app.core.security import get_password_hash
 from app.core.config import get_settings
 import pandas as pd
-import io
 
 router = APIRouter()
 settings = get_settings()
@@ -20,59 +20,109 @@ async def upload_schools(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    contents = await file.read()
     if file.filename.endswith('.csv'):
-        df = pd.read_csv(io.BytesIO(contents), encoding_errors='ignore', dtype=str)
+        df = pd.read_csv(file.file, encoding_errors='ignore', dtype=str)
     else:
-        df = pd.read_excel(io.BytesIO(contents), dtype=str)
+        df = pd.read_excel(file.file, dtype=str, engine='calamine')
     
     # Expect columns: code, name, state_code, lga_code, custodian_code, email, category, accrd_year
     required_cols = {'code', 'name', 'state_code', 'lga_code', 'custodian_code'}
     if not required_cols.issubset(df.columns):
         raise HTTPException(status_code=400, detail=f"Missing columns. Required: {required_cols}")
 
-    # Validation
-    result = await db.execute(select(State.code))
-    existing_state_codes = set(result.scalars().all())
-    result = await db.execute(select(LGA.code))
-    existing_lga_codes = set(result.scalars().all())
-    result = await db.execute(select(Custodian.code))
-    existing_custodian_codes = set(result.scalars().all())
-
-    schools = []
-    for _, row in df.iterrows():
-        state_code = str(row['state_code']).strip()
-        lga_code = str(row['lga_code']).strip()
-        custodian_code = str(row['custodian_code']).strip()
-
-        if state_code not in existing_state_codes:
-            raise HTTPException(status_code=400, detail=f"State code {state_code} does not exist.")
-        if lga_code and lga_code.lower() != 'nan' and lga_code not in existing_lga_codes:
-            raise HTTPException(status_code=400, detail=f"LGA code {lga_code} does not exist.")
-        if custodian_code and custodian_code.lower() != 'nan' and custodian_code not in existing_custodian_codes:
-            raise HTTPException(status_code=400, detail=f"Custodian code {custodian_code} does not exist.")
-
-        category_val = str(row.get('category', 'PUB')).strip().upper()
-        if category_val not in ["PUB", "PRV", "FED"]:
-            raise HTTPException(status_code=400, detail=f"Invalid category '{category_val}' for school {str(row['code'])}. Allowed: PUB, PRV, FED.")
-
-        school = School(
-            code=str(row['code']),
-            name=str(row['name']),
-            state_code=state_code,
-            lga_code=lga_code if lga_code and lga_code.lower() != 'nan' else None,
-            custodian_code=custodian_code if custodian_code and custodian_code.lower() != 'nan' else None,
-            email=str(row.get('email', '')) if pd.notna(row.get('email')) else None,
-            category=category_val,
-            accrd_year=str(row.get('accrd_year', '')).strip() if pd.notna(row.get('accrd_year')) else None,
-            approval_status=str(row.get('approval_status', '')).strip() if pd.notna(row.get('approval_status')) else None,
-            gender=str(row.get('gender', '')).strip() if pd.notna(row.get('gender')) else None,
-            status=str(row.get('status', 'active'))
+    # Validation: fetch all three reference code sets in one UNION ALL query
+    result = await db.execute(
+        select(literal("state").label("kind"), State.code.label("code"))
+        .union_all(
+            select(literal("lga"), LGA.code),
+            select(literal("custodian"), Custodian.code),
+        )
+    )
+    code_sets = {"state": set(), "lga": set(), "custodian": set()}
+    for kind, code in result.all():
+        code_sets[kind].add(code)
+    existing_state_codes = code_sets["state"]
+    existing_lga_codes = code_sets["lga"]
+    existing_custodian_codes = code_sets["custodian"]
+
+    # Vectorized validation: check whole columns with isin and report every
+    # bad value at once instead of failing on the first offending row.
+    # astype(str) keeps missing cells as NaN, so blank cells are filled to ''
+    # explicitly; a present mask is then just a non-empty check.
+    code_col = df['code'].astype(str).fillna('')
+    name_col = df['name'].astype(str).fillna('')
+    state_col = df['state_code'].astype(str).str.strip().fillna('')
+    lga_col = df['lga_code'].astype(str).str.strip().fillna('')
+    custodian_col = df['custodian_code'].astype(str).str.strip().fillna('')
+
+    bad_states = sorted(set(state_col[~state_col.isin(existing_state_codes)]))
+    if bad_states:
+        raise HTTPException(status_code=400, detail=f"State codes do not exist: {bad_states}")
+
+    lga_present = lga_col != ''
+    bad_lgas = sorted(set(lga_col[lga_present & ~lga_col.isin(existing_lga_codes)]))
+    if bad_lgas:
+        raise HTTPException(status_code=400, detail=f"LGA codes do not exist: {bad_lgas}")
+
+    custodian_present = custodian_col != ''
+    bad_custodians = sorted(set(custodian_col[custodian_present & ~custodian_col.isin(existing_custodian_codes)]))
+    if bad_custodians:
+        raise HTTPException(status_code=400, detail=f"Custodian codes do not exist: {bad_custodians}")
+
+    if 'category' in df.columns:
+        category_col = df['category'].astype(str).str.strip().str.upper().fillna('')
+    else:
+        category_col = pd.Series('PUB', index=df.index)
+    bad_category = ~category_col.isin(["PUB", "PRV", "FED"])
+    if bad_category.any():
+        bad = sorted(set(category_col[bad_category]))
+        codes = sorted(set(code_col[bad_category]))
+        raise HTTPException(status_code=400, detail=f"Invalid categories {bad} for schools {codes}. Allowed: PUB, PRV, FED.")
+
+    # Normalize whole columns up front, then assemble the records with a zip
+    # instead of per-cell work inside iterrows
+    def _optional_col(name, default=None):
+        if name in df.columns:
+            return df[name].astype(str).str.strip().astype(object).where(df[name].notna(), default)
+        return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+    lga_norm = lga_col.astype(object).where(lga_present, None)
+    custodian_norm = custodian_col.astype(object).where(custodian_present, None)
+    if 'email' in df.columns:
+        email_norm = df['email'].astype(object).where(df['email'].notna(), None)
+    else:
+        email_norm = pd.Series([None] * len(df), index=df.index, dtype=object)
+    # Core inserts bypass the model-level default, so apply it here
+    accrd_norm = _optional_col('accrd_year', "2025")
+    approval_norm = _optional_col('approval_status')
+    gender_norm = _optional_col('gender')
+    if 'status' in df.columns:
+        status_norm = df['status'].astype(str).fillna('active')
+    else:
+        status_norm = pd.Series(['active'] * len(df), index=df.index, dtype=object)
+
+    schools = [
+        {
+            "code": code,
+            "name": name,
+            "state_code": state_code,
+            "lga_code": lga_code,
+            "custodian_code": custodian_code,
+            "email": email,
+            "category": category,
+            "accrd_year": accrd_year,
+            "approval_status": approval_status,
+            "gender": gender,
+            "status": status_val,
+        }
+        for code, name, state_code, lga_code, custodian_code, email, category, accrd_year, approval_status, gender, status_val in zip(
+            code_col, name_col, state_col, lga_norm, custodian_norm,
+            email_norm, category_col, accrd_norm, approval_norm, gender_norm, status_norm
         )
-        schools.append(school)
+    ]
     
-    db.add_all(schools)
     try:
+        await bulk_insert(db, School, schools)
         await db.commit()
     except Exception as e:
         await db.rollback()
@@ -96,60 +146,109 @@ async def upload_bece_schools(
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ])),
     request: Request = None
 ):
-    contents = await file.read()
     if file.filename.endswith('.csv'):
-        df = pd.read_csv(io.BytesIO(contents), encoding_errors='ignore', dtype=str)
+        df = pd.read_csv(file.file, encoding_errors='ignore', dtype=str)
     else:
-        df = pd.read_excel(io.BytesIO(contents), dtype=str)
+        df = pd.read_excel(file.file, dtype=str, engine='calamine')
     
     # Expect columns: code, name, state_code, lga_code, custodian_code, email, category, accrd_year
     required_cols = {'code', 'name', 'state_code', 'lga_code', 'custodian_code'}
     if not required_cols.issubset(df.columns):
         raise HTTPException(status_code=400, detail=f"Missing columns. Required: {required_cols}")
 
-    # Validation
-    result = await db.execute(select(State.code))
-    existing_state_codes = set(result.scalars().all())
-    result = await db.execute(select(LGA.code))
-    existing_lga_codes = set(result.scalars().all())
-    from app.infrastructure.database.models import BECECustodian
-    result = await db.execute(select(BECECustodian.code))
-    existing_custodian_codes = set(result.scalars().all())
-
-    schools = []
-    for _, row in df.iterrows():
-        state_code = str(row['state_code']).strip()
-        lga_code = str(row['lga_code']).strip()
-        custodian_code = str(row['custodian_code']).strip()
-
-        if state_code not in existing_state_codes:
-            raise HTTPException(status_code=400, detail=f"State code {state_code} does not exist.")
-        if lga_code and lga_code.lower() != 'nan' and lga_code not in existing_lga_codes:
-            raise HTTPException(status_code=400, detail=f"LGA code {lga_code} does not exist.")
-        if custodian_code and custodian_code.lower() != 'nan' and custodian_code not in existing_custodian_codes:
-            raise HTTPException(status_code=400, detail=f"Custodian code {custodian_code} does not exist.")
-
-        category_val = str(row.get('category', 'PUB')).strip().upper()
-        if category_val not in ["PUB", "PRV", "FED"]:
-            raise HTTPException(status_code=400, detail=f"Invalid category '{category_val}' for school {str(row['code'])}. Allowed: PUB, PRV, FED.")
-
-        school = BECESchool(
-            code=str(row['code']),
-            name=str(row['name']),
-            state_code=state_code,
-            lga_code=lga_code if lga_code and lga_code.lower() != 'nan' else None,
-            custodian_code=custodian_code if custodian_code and custodian_code.lower() != 'nan' else None,
-            email=str(row.get('email', '')) if pd.notna(row.get('email')) else None,
-            category=category_val,
-            accrd_year=str(row.get('accrd_year', '')).strip() if pd.notna(row.get('accrd_year')) else None,
-            approval_status=str(row.get('approval_status', '')).strip() if pd.notna(row.get('approval_status')) else None,
-            gender=str(row.get('gender', '')).strip() if pd.notna(row.get('gender')) else None,
-            status=str(row.get('status', 'active'))
+    # Validation: fetch all three reference code sets in one UNION ALL query
+    result = await db.execute(
+        select(literal("state").label("kind"), State.code.label("code"))
+        .union_all(
+            select(literal("lga"), LGA.code),
+            select(literal("custodian"), BECECustodian.code),
+        )
+    )
+    code_sets = {"state": set(), "lga": set(), "custodian": set()}
+    for kind, code in result.all():
+        code_sets[kind].add(code)
+    existing_state_codes = code_sets["state"]
+    existing_lga_codes = code_sets["lga"]
+    existing_custodian_codes = code_sets["custodian"]
+
+    # Vectorized validation: check whole columns with isin and report every
+    # bad value at once instead of failing on the first offending row.
+    # astype(str) keeps missing cells as NaN, so blank cells are filled to ''
+    # explicitly; a present mask is then just a non-empty check.
+    code_col = df['code'].astype(str).fillna('')
+    name_col = df['name'].astype(str).fillna('')
+    state_col = df['state_code'].astype(str).str.strip().fillna('')
+    lga_col = df['lga_code'].astype(str).str.strip().fillna('')
+    custodian_col = df['custodian_code'].astype(str).str.strip().fillna('')
+
+    bad_states = sorted(set(state_col[~state_col.isin(existing_state_codes)]))
+    if bad_states:
+        raise HTTPException(status_code=400, detail=f"State codes do not exist: {bad_states}")
+
+    lga_present = lga_col != ''
+    bad_lgas = sorted(set(lga_col[lga_present & ~lga_col.isin(existing_lga_codes)]))
+    if bad_lgas:
+        raise HTTPException(status_code=400, detail=f"LGA codes do not exist: {bad_lgas}")
+
+    custodian_present = custodian_col != ''
+    bad_custodians = sorted(set(custodian_col[custodian_present & ~custodian_col.isin(existing_custodian_codes)]))
+    if bad_custodians:
+        raise HTTPException(status_code=400, detail=f"Custodian codes do not exist: {bad_custodians}")
+
+    if 'category' in df.columns:
+        category_col = df['category'].astype(str).str.strip().str.upper().fillna('')
+    else:
+        category_col = pd.Series('PUB', index=df.index)
+    bad_category = ~category_col.isin(["PUB", "PRV", "FED"])
+    if bad_category.any():
+        bad = sorted(set(category_col[bad_category]))
+        codes = sorted(set(code_col[bad_category]))
+        raise HTTPException(status_code=400, detail=f"Invalid categories {bad} for schools {codes}. Allowed: PUB, PRV, FED.")
+
+    # Normalize whole columns up front, then assemble the records with a zip
+    # instead of per-cell work inside iterrows
+    def _optional_col(name, default=None):
+        if name in df.columns:
+            return df[name].astype(str).str.strip().astype(object).where(df[name].notna(), default)
+        return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+    lga_norm = lga_col.astype(object).where(lga_present, None)
+    custodian_norm = custodian_col.astype(object).where(custodian_present, None)
+    if 'email' in df.columns:
+        email_norm = df['email'].astype(object).where(df['email'].notna(), None)
+    else:
+        email_norm = pd.Series([None] * len(df), index=df.index, dtype=object)
+    # Core inserts bypass the model-level default, so apply it here
+    accrd_norm = _optional_col('accrd_year', "2025")
+    approval_norm = _optional_col('approval_status')
+    gender_norm = _optional_col('gender')
+    if 'status' in df.columns:
+        status_norm = df['status'].astype(str).fillna('active')
+    else:
+        status_norm = pd.Series(['active'] * len(df), index=df.index, dtype=object)
+
+    schools = [
+        {
+            "code": code,
+            "name": name,
+            "state_code": state_code,
+            "lga_code": lga_code,
+            "custodian_code": custodian_code,
+            "email": email,
+            "category": category,
+            "accrd_year": accrd_year,
+            "approval_status": approval_status,
+            "gender": gender,
+            "status": status_val,
+        }
+        for code, name, state_code, lga_code, custodian_code, email, category, accrd_year, approval_status, gender, status_val in zip(
+            code_col, name_col, state_col, lga_norm, custodian_norm,
+            email_norm, category_col, accrd_norm, approval_norm, gender_norm, status_norm
         )
-        schools.append(school)
+    ]
     
-    db.add_all(schools)
     try:
+        await bulk_insert(db, BECESchool, schools)
         await db.commit()
     except Exception as e:
         await db.rollback()
@@ -172,49 +271,60 @@ async def upload_states(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
 ):
-    contents = await file.read()
     if file.filename.endswith('.csv'):
-        df = pd.read_csv(io.BytesIO(contents), encoding_errors='ignore', dtype=str)
+        df = pd.read_csv(file.file, encoding_errors='ignore', dtype=str)
     else:
-        df = pd.read_excel(io.BytesIO(contents), dtype=str)
+        df = pd.read_excel(file.file, dtype=str, engine='calamine')
     
     # code, name, zone_code
     required_cols = {'code', 'name', 'zone_code'}
     if not required_cols.issubset(df.columns):
         raise HTTPException(status_code=400, detail=f"Missing columns. Required: {required_cols}")
 
-    states = []
-    from app.infrastructure.database.models import User as DBUser
-    for _, row in df.iterrows():
-        state_code = str(row['code'])
-        state_name = str(row['name'])
-        state = State(
-            code=state_code,
-            name=state_name,
-            capital=str(row.get('capital', '')) if pd.notna(row.get('capital')) else None,
-            zone_code=str(row['zone_code']),
-            status=str(row.get('status', 'active'))
-        )
-        states.append(state)
-        
-        # Also create a default state user
-        state_email = f"state_{state_code}@neco.gov.ng" # Default naming convention or from file
-        if 'email' in df.columns:
-            state_email = str(row['email'])
-            
-        result = await db.execute(select(DBUser).filter(DBUser.email == state_email))
-        existing_user = result.scalars().first()
-        if not existing_user:
-            state_user = DBUser(
+    # Build the state records column-wise and insert them in one executemany;
+    # astype(str) keeps missing cells as NaN, so fill blanks explicitly
+    codes = df['code'].astype(str).fillna('')
+    if 'capital' in df.columns:
+        capital_norm = df['capital'].astype(str).astype(object).where(df['capital'].notna(), None)
+    else:
+        capital_norm = pd.Series([None] * len(df), index=df.index, dtype=object)
+    if 'status' in df.columns:
+        status_norm = df['status'].astype(str).fillna('active')
+    else:
+        status_norm = pd.Series(['active'] * len(df), index=df.index, dtype=object)
+    states = pd.DataFrame({
+        "code": codes,
+        "name": df['name'].astype(str).fillna(''),
+        "capital": capital_norm,
+        "zone_code": df['zone_code'].astype(str).fillna(''),
+        "status": status_norm,
+    }).to_dict('records')
+    
+    # Default state users: naming convention unless the file carries emails
+    if 'email' in df.columns:
+        state_emails = df['email'].astype(str).str.strip().str.lower().fillna('')
+    else:
+        state_emails = pd.Series([f"state_{code}@neco.gov.ng" for code in codes], index=df.index)
+    
+    # One IN query for the already-registered emails, and hash the constant
+    # default password once instead of per row (bcrypt costs tens of ms)
+    result = await db.execute(select(User.email).filter(User.email.in_(list(state_emails))))
+    existing_emails = set(result.scalars())
+    default_hash = await run_in_threadpool(get_password_hash, settings.DEFAULT_STATE_PASSWORD)
+
+    for state_code, state_email in zip(codes, state_emails):
+        if state_email and state_email not in existing_emails:
+            state_user = User(
                 email=state_email,
-                hashed_password=get_password_hash(settings.DEFAULT_STATE_PASSWORD),
+                hashed_password=default_hash,
                 role=UserRole.STATE.value,
                 state_code=state_code
             )
             db.add(state_user)
 
-    db.add_all(states)
     try:
+        if states:
+            await db.execute(insert(State), states)
         await db.commit()
     except Exception as e:
         await db.rollback()
@@ -230,12 +340,11 @@ async def upload_lgas(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
 ):
-    contents = await file.read()
     if file.filename.endswith('.csv'):
         # Handle potential BOM in CSV
-        df = pd.read_csv(io.BytesIO(contents), encoding_errors='ignore', dtype=str)
+        df = pd.read_csv(file.file, encoding_errors='ignore', dtype=str)
     else:
-        df = pd.read_excel(io.BytesIO(contents), dtype=str)
+        df = pd.read_excel(file.file, dtype=str, engine='calamine')
     
     # Expect columns: StateCode, LgaCode, LGA
     # Mapping to model: state_code, code, name
@@ -249,29 +358,23 @@ async def upload_lgas(
     result = await db.execute(select(State.code))
     existing_state_codes = set(result.scalars().all())
     
-    lgas = []
-    missing_states = set()
-    for _, row in df.iterrows():
-        state_code = str(row['StateCode']).strip()
-        if state_code not in existing_state_codes:
-            missing_states.add(state_code)
-            continue
-            
-        lga = LGA(
-            code=str(row['LgaCode']).strip(),
-            name=str(row['LGA']).strip(),
-            state_code=state_code
-        )
-        lgas.append(lga)
-    
+    # astype(str) keeps missing cells as NaN, so fill blanks explicitly
+    state_col = df['StateCode'].astype(str).str.strip().fillna('')
+    missing_states = sorted(set(state_col[~state_col.isin(existing_state_codes)]))
     if missing_states:
         raise HTTPException(
             status_code=400, 
-            detail=f"Some LGAs reference non-existent state codes: {list(missing_states)}. Please upload States first."
+            detail=f"Some LGAs reference non-existent state codes: {missing_states}. Please upload States first."
         )
 
-    db.add_all(lgas)
+    lgas = pd.DataFrame({
+        "code": df['LgaCode'].astype(str).str.strip().fillna(''),
+        "name": df['LGA'].astype(str).str.strip().fillna(''),
+        "state_code": state_col,
+    }).to_dict('records')
+
     try:
+        await bulk_insert(db, LGA, lgas)
         await db.commit()
     except Exception as e:
         await db.rollback()
@@ -287,11 +390,10 @@ async def upload_custodians(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
 ):
-    contents = await file.read()
     if file.filename.endswith('.csv'):
-        df = pd.read_csv(io.BytesIO(contents), encoding_errors='ignore', dtype=str)
+        df = pd.read_csv(file.file, encoding_errors='ignore', dtype=str)
     else:
-        df = pd.read_excel(io.BytesIO(contents), dtype=str)
+        df = pd.read_excel(file.file, dtype=str, engine='calamine')
     
     # Expect columns: code, name, state_code, lga_code, town
     required_cols = {'code', 'name'}
@@ -305,28 +407,42 @@ async def upload_custodians(
     result = await db.execute(select(LGA.code))
     existing_lga_codes = set(result.scalars().all())
 
-    custodians = []
-    for _, row in df.iterrows():
-        state_code = str(row.get('state_code', '')).strip() if pd.notna(row.get('state_code')) else None
-        lga_code = str(row.get('lga_code', '')).strip() if pd.notna(row.get('lga_code')) else None
-        
-        if state_code and state_code not in existing_state_codes:
-            raise HTTPException(status_code=400, detail=f"State code {state_code} does not exist.")
-        if lga_code and lga_code not in existing_lga_codes:
-            raise HTTPException(status_code=400, detail=f"LGA code {lga_code} does not exist.")
-
-        custodian = Custodian(
-            code=str(row['code']),
-            name=str(row['name']),
-            state_code=state_code if state_code else None,
-            lga_code=lga_code if lga_code else None,
-            town=str(row.get('town', '')) if pd.notna(row.get('town')) else "",
-            status=str(row.get('status', 'active'))
-        )
-        custodians.append(custodian)
+    def _nullable_col(name):
+        if name in df.columns:
+            stripped = df[name].astype(str).str.strip()
+            return stripped.astype(object).where(df[name].notna() & (stripped != ''), None)
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+    state_norm = _nullable_col('state_code')
+    lga_norm = _nullable_col('lga_code')
+
+    bad_states = sorted(set(state_norm[state_norm.notna() & ~state_norm.isin(existing_state_codes)]))
+    if bad_states:
+        raise HTTPException(status_code=400, detail=f"State codes do not exist: {bad_states}")
+    bad_lgas = sorted(set(lga_norm[lga_norm.notna() & ~lga_norm.isin(existing_lga_codes)]))
+    if bad_lgas:
+        raise HTTPException(status_code=400, detail=f"LGA codes do not exist: {bad_lgas}")
+
+    if 'town' in df.columns:
+        town_norm = df['town'].astype(str).astype(object).where(df['town'].notna(), "")
+    else:
+        town_norm = pd.Series([""] * len(df), index=df.index, dtype=object)
+    if 'status' in df.columns:
+        status_norm = df['status'].astype(str)
+    else:
+        status_norm = pd.Series(['active'] * len(df), index=df.index, dtype=object)
+
+    custodians = pd.DataFrame({
+        "code": df['code'].astype(str),
+        "name": df['name'].astype(str),
+        "state_code": state_norm,
+        "lga_code": lga_norm,
+        "town": town_norm,
+        "status": status_norm,
+    }).to_dict('records')
     
-    db.add_all(custodians)
     try:
+        await bulk_insert(db, Custodian, custodians)
         await db.commit()
     except Exception as e:
         await db.rollback()
@@ -342,11 +458,10 @@ async def upload_bece_custodians(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.HQ]))
 ):
-    contents = await file.read()
     if file.filename.endswith('.csv'):
-        df = pd.read_csv(io.BytesIO(contents), encoding_errors='ignore', dtype=str)
+        df = pd.read_csv(file.file, encoding_errors='ignore', dtype=str)
     else:
-        df = pd.read_excel(io.BytesIO(contents), dtype=str)
+        df = pd.read_excel(file.file, dtype=str, engine='calamine')
     
     # Expect columns: code, name, state_code, lga_code, town
     required_cols = {'code', 'name'}
@@ -360,29 +475,42 @@ async def upload_bece_custodians(
     result = await db.execute(select(LGA.code))
     existing_lga_codes = set(result.scalars().all())
 
-    from app.infrastructure.database.models import BECECustodian
-    custodians = []
-    for _, row in df.iterrows():
-        state_code = str(row.get('state_code', '')).strip() if pd.notna(row.get('state_code')) else None
-        lga_code = str(row.get('lga_code', '')).strip() if pd.notna(row.get('lga_code')) else None
-        
-        if state_code and state_code not in existing_state_codes:
-            raise HTTPException(status_code=400, detail=f"State code {state_code} does not exist.")
-        if lga_code and lga_code not in existing_lga_codes:
-            raise HTTPException(status_code=400, detail=f"LGA code {lga_code} does not exist.")
-
-        custodian = BECECustodian(
-            code=str(row['code']),
-            name=str(row['name']),
-            state_code=state_code if state_code else None,
-            lga_code=lga_code if lga_code else None,
-            town=str(row.get('town', '')) if pd.notna(row.get('town')) else "",
-            status=str(row.get('status', 'active'))
-        )
-        custodians.append(custodian)
+    def _nullable_col(name):
+        if name in df.columns:
+            stripped = df[name].astype(str).str.strip()
+            return stripped.astype(object).where(df[name].notna() & (stripped != ''), None)
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+    state_norm = _nullable_col('state_code')
+    lga_norm = _nullable_col('lga_code')
+
+    bad_states = sorted(set(state_norm[state_norm.notna() & ~state_norm.isin(existing_state_codes)]))
+    if bad_states:
+        raise HTTPException(status_code=400, detail=f"State codes do not exist: {bad_states}")
+    bad_lgas = sorted(set(lga_norm[lga_norm.notna() & ~lga_norm.isin(existing_lga_codes)]))
+    if bad_lgas:
+        raise HTTPException(status_code=400, detail=f"LGA codes do not exist: {bad_lgas}")
+
+    if 'town' in df.columns:
+        town_norm = df['town'].astype(str).astype(object).where(df['town'].notna(), "")
+    else:
+        town_norm = pd.Series([""] * len(df), index=df.index, dtype=object)
+    if 'status' in df.columns:
+        status_norm = df['status'].astype(str)
+    else:
+        status_norm = pd.Series(['active'] * len(df), index=df.index, dtype=object)
+
+    custodians = pd.DataFrame({
+        "code": df['code'].astype(str),
+        "name": df['name'].astype(str),
+        "state_code": state_norm,
+        "lga_code": lga_norm,
+        "town": town_norm,
+        "status": status_norm,
+    }).to_dict('records')
     
-    db.add_all(custodians)
     try:
+        await bulk_insert(db, BECECustodian, custodians)
         await db.commit()
     except Exception as e:
         await db.rollback()
@@ -1,17 +1,44 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional, List
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from app.core.config import get_settings
 from app.infrastructure.database.session import get_db
-from app.infrastructure.database.models import User, UserRole
+from app.infrastructure.database.models import State, User, UserRole
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
+# Lock flags change only when an admin locks/unlocks states, so a short TTL
+# cache keeps check_state_not_locked off the database for most writes.
+_LOCK_CACHE_TTL_SECONDS = 5.0
+_lock_cache = {}
+
+
+def invalidate_lock_cache():
+    """Drop cached lock flags after states are locked or unlocked."""
+    _lock_cache.clear()
+
+
+# Authenticated user rows rarely change mid-session, so a short TTL cache
+# skips the per-request user SELECT. The JWT already proves identity; the
+# lookup only reflects password/role/state changes, for which 30s staleness
+# is acceptable because the mutating endpoints invalidate explicitly.
+_USER_CACHE_TTL_SECONDS = 30.0
+_user_cache = {}
+
+
+def invalidate_user_cache(email: Optional[str] = None):
+    """Drop cached users after credentials, roles, or scopes change."""
+    if email is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(email.lower(), None)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -22,7 +49,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    # FastAPI caches this dependency per request, so stacked dependencies
+    # (check_role + check_state_not_locked) already share one lookup; the
+    # request.state copy is for middleware and audit code outside the
+    # dependency tree.
+    cached = getattr(request.state, "current_user", None)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -35,16 +70,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    result = await db.execute(select(User).filter(User.email == email))
-    user = result.scalars().first()
+
+    cache_key = email.lower()
+    entry = _user_cache.get(cache_key)
+    if entry is not None and time.monotonic() - entry[0] < _USER_CACHE_TTL_SECONDS:
+        request.state.current_user = entry[1]
+        return entry[1]
+
+    result = await db.execute(select(User).filter(func.lower(User.email) == email.lower()))
+    user = result.scalar_one_or_none()
     if user is None:
         raise credentials_exception
+    _user_cache[cache_key] = (time.monotonic(), user)
+    request.state.current_user = user
     return user
 
 def check_role(roles: List[UserRole]):
+    # Built once when the route is declared; every request then does a
+    # single O(1) membership test
+    allowed = frozenset(role.value for role in roles)
+
     async def role_checker(current_user: User = Depends(get_current_user)):
-        if current_user.role not in [role.value for role in roles]:
+        if current_user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have enough permissions to access this resource"
@@ -68,12 +115,16 @@ async def check_state_not_locked(current_user: User = Depends(get_current_user),
     Dependency that blocks write operations for state users whose state is locked.
     Admin and HQ users are never affected by the lock.
     """
-    from app.infrastructure.database.models import State as StateModel
-    
     if current_user.role == UserRole.STATE.value and current_user.state_code:
-        result = await db.execute(select(StateModel).filter(StateModel.code == current_user.state_code))
-        state = result.scalars().first()
-        if state and state.is_locked:
+        cached = _lock_cache.get(current_user.state_code)
+        if cached is not None and time.monotonic() - cached[0] < _LOCK_CACHE_TTL_SECONDS:
+            is_locked = cached[1]
+        else:
+            is_locked = bool(await db.scalar(
+                select(State.is_locked).filter(State.code == current_user.state_code)
+            ))
+            _lock_cache[current_user.state_code] = (time.monotonic(), is_locked)
+        if is_locked:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Your state is currently locked. You can only view data. Contact the administrator."
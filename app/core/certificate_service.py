@@ -100,8 +100,11 @@ def generate_certificate(
 
     # Expiry Date (Accreditation Date + Validity Years)
     try:
-        from dateutil.relativedelta import relativedelta
-        expiry_date_obj = acc_date_obj + relativedelta(years=validity_years)
+        # Plain year replacement; Feb 29 clamps to Feb 28 off leap years
+        try:
+            expiry_date_obj = acc_date_obj.replace(year=acc_date_obj.year + validity_years)
+        except ValueError:
+            expiry_date_obj = acc_date_obj.replace(year=acc_date_obj.year + validity_years, day=28)
         expiry_date_str = expiry_date_obj.strftime("%b, %Y")
     except Exception:
         expiry_date_str = ""
@@ -9,6 +9,11 @@ class Settings(BaseSettings):
     ADMIN_EMAIL: str = "admin@neco.gov.ng"
     ADMIN_PASSWORD: str = "123456"
     DEFAULT_STATE_PASSWORD: str = "NECOpassword@1"
+
+    # Optional pre-generated bcrypt hashes for the fixed seed passwords; when
+    # set (e.g. baked into the deploy env), seed.py skips those KDF runs
+    HQ_PASSWORD_HASH: str = ""
+    ACCOUNTANT_PASSWORD_HASH: str = ""
     SMTP_HOST: str = ""
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
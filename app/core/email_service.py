@@ -54,6 +54,72 @@ def _send_email_smtp_robust(msg: MIMEMultipart, recipients: list) -> bool:
     return False
 
 
+class SMTPSession:
+    """
+    Context manager holding one SMTP connection open so a batch of messages
+    shares a single handshake + login instead of reconnecting per email.
+    Connects with the same primary/fallback order as _send_email_smtp_robust;
+    if neither host is reachable, send() reports failure for every message.
+    """
+
+    def __init__(self):
+        self._server = None
+        self._from_addr = None
+        self._is_fallback = False
+
+    def __enter__(self):
+        # 1. Try Primary SMTP
+        if settings.SMTP_HOST:
+            try:
+                server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=10)
+                if settings.SMTP_TLS:
+                    server.starttls()
+                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+                self._server = server
+                self._from_addr = settings.SMTP_USER
+                return self
+            except Exception as e:
+                print(f"[SMTP-PRIMARY-ERROR] Failed: {e}")
+
+        # 2. Try Fallback SMTP
+        if settings.FALLBACK_SMTP_HOST:
+            try:
+                print(f"[SMTP-FALLBACK] Attempting fallback via {settings.FALLBACK_SMTP_HOST}...")
+                server = smtplib.SMTP(settings.FALLBACK_SMTP_HOST, settings.FALLBACK_SMTP_PORT, timeout=10)
+                if settings.FALLBACK_SMTP_TLS:
+                    server.starttls()
+                server.login(settings.FALLBACK_SMTP_USER, settings.FALLBACK_SMTP_PASSWORD)
+                self._server = server
+                self._from_addr = settings.FALLBACK_SMTP_USER
+                self._is_fallback = True
+                return self
+            except Exception as e:
+                print(f"[SMTP-FALLBACK-ERROR] Failed: {e}")
+
+        return self
+
+    def send(self, msg: MIMEMultipart, recipients: list) -> bool:
+        if self._server is None:
+            return False
+        try:
+            if self._is_fallback:
+                # Match the fallback user for better deliverability
+                msg.replace_header('From', f"NECO Accreditation <{settings.FALLBACK_SMTP_USER}>")
+            self._server.send_message(msg, from_addr=self._from_addr, to_addrs=recipients)
+            return True
+        except Exception as e:
+            print(f"[SMTP-SESSION-ERROR] Failed: {e}")
+            return False
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+        return False
+
+
 def send_credentials_email(to_email: str, password: str, name: str, user_type: str = "State Coordinator") -> bool:
     """
     Send login credentials to a state or zone email address.
@@ -94,10 +160,9 @@ NECO Accreditation Team
         print(f"  Email: {to_email}")
         print(f"  Password: {password}")
         return False
-def send_accreditation_alert(to_emails: list, school_name: str, cc_emails: list = None) -> bool:
+def _build_accreditation_alert(to_emails: list, school_name: str, cc_emails: list = None):
     """
-    Send accreditation renewal alert to school, state, and HQ.
-    Always CC accreditation@neco.gov.ng as per the requirement.
+    Build the accreditation alert message. Returns (msg, recipients, all_ccs).
     """
     subject = f"NECO Accreditation Alert - {school_name}"
     body = f"""
@@ -139,11 +204,18 @@ NECO Accreditation Team</p>
     # All recipients combined for SMTP send_message
     recipients = to_emails + all_ccs
 
-    # All recipients combined for SMTP send_message
-    recipients = to_emails + all_ccs
+    return msg, recipients, all_ccs
+
+
+def send_accreditation_alert(to_emails: list, school_name: str, cc_emails: list = None) -> bool:
+    """
+    Send accreditation renewal alert to school, state, and HQ.
+    Always CC accreditation@neco.gov.ng as per the requirement.
+    """
+    msg, recipients, all_ccs = _build_accreditation_alert(to_emails, school_name, cc_emails)
 
     success = _send_email_smtp_robust(msg, recipients)
-    
+
     if success:
         print(f"[EMAIL-ALERT] Accreditation alert sent for {school_name} to {to_emails} (CC: {all_ccs})")
         return True
@@ -151,6 +223,23 @@ NECO Accreditation Team</p>
         print(f"[EMAIL-FALLBACK] SMTP failed or not configured. Accreditation alert for {school_name} would be sent to {to_emails} (CC: {all_ccs})")
         return False
 
+
+def send_accreditation_alerts(alerts: list) -> int:
+    """
+    Send a batch of accreditation alerts over a single SMTP connection.
+    Each item is a (to_emails, school_name) tuple. Returns the number sent.
+    """
+    sent = 0
+    with SMTPSession() as session:
+        for to_emails, school_name in alerts:
+            msg, recipients, all_ccs = _build_accreditation_alert(to_emails, school_name)
+            if session.send(msg, recipients):
+                print(f"[EMAIL-ALERT] Accreditation alert sent for {school_name} to {to_emails} (CC: {all_ccs})")
+                sent += 1
+            else:
+                print(f"[EMAIL-FALLBACK] SMTP failed or not configured. Accreditation alert for {school_name} would be sent to {to_emails} (CC: {all_ccs})")
+    return sent
+
 def send_state_accreditation_report(
     to_email: str, 
     cc_emails: list, 
@@ -196,8 +285,6 @@ NECO Accreditation Team
     
     recipients = [to_email] + all_ccs
 
-    recipients = [to_email] + all_ccs
-
     success = _send_email_smtp_robust(msg, recipients)
     
     if success:
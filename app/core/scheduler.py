@@ -2,16 +2,25 @@ import os
 import sys
 import asyncio
 from datetime import datetime, date
-from dateutil.relativedelta import relativedelta
-from sqlalchemy.orm import Session
+import numpy as np
+import pandas as pd
 from sqlalchemy import select
 from app.infrastructure.database.session import SessionLocal
 from app.infrastructure.database.models import School, BECESchool, State, User, UserRole, AccreditationStatus
-from app.core.email_service import send_accreditation_alert
+from app.core.email_service import send_accreditation_alerts
 from app.core.config import get_settings
 
 settings = get_settings()
 
+def build_recipients(school, state_email):
+    """Alert recipients for one school: admin, school, state — deduplicated."""
+    recipients = {settings.ADMIN_EMAIL}
+    if school.email:
+        recipients.add(school.email)
+    if state_email:
+        recipients.add(state_email)
+    return list(recipients)
+
 async def check_accreditation():
     async with SessionLocal() as db:
         try:
@@ -21,99 +30,97 @@ async def check_accreditation():
             
             # Include all accredited-like statuses
             accredited_statuses = ["Full", "Partial", "Failed", AccreditationStatus.ACCREDITED.value]
-            
+
+            # Alerts are queued during the scan and dispatched together so the
+            # serial SMTP round-trips don't block the event loop per school
+            alerts = []
+
             for model in models_to_check:
-                # Query schools with accredited statuses and their zone info
-                # We join with State to get the zone_code
-                stmt = select(model, State.zone_code).join(State, model.state_code == State.code).filter(
+                # Query schools with accredited statuses and their state info.
+                # Selecting zone_code and email here avoids a per-school State
+                # lookup when an alert needs the state's address
+                stmt = select(model, State.zone_code, State.email).join(State, model.state_code == State.code).filter(
                     model.accreditation_status.in_(accredited_statuses)
                 )
                 result = await db.execute(stmt)
                 rows = result.all()
-                
-                for school, zone_code in rows:
-                    if not school.accredited_date:
-                        continue
-                
+                if not rows:
+                    continue
+
+                # Vectorize the expiry math: the per-school date parsing and
+                # day arithmetic run as pandas/NumPy column operations, and
+                # only the handful of rows needing action are looped over
+                df = pd.DataFrame({
+                    "accredited_date": [school.accredited_date for school, _, _ in rows],
+                    "zone_code": [zone_code for _, zone_code, _ in rows],
+                    "status": [school.accreditation_status for school, _, _ in rows],
+                })
+                # Assuming accredited_date is stored in ISO format (YYYY-MM-DD...);
+                # missing or malformed dates coerce to NaT and are skipped
+                df["acc"] = pd.to_datetime(df["accredited_date"].str.split("T").str[0], errors="coerce")
+
+                # Apply Validity Rules
+                # 1. Foreign Zone (07) gets 10 years regardless of status
+                # 2. Other zones based on status (default fallback 5)
+                df["validity_years"] = np.select(
+                    [
+                        df["zone_code"] == "07",
+                        df["status"].isin(["Full", AccreditationStatus.ACCREDITED.value]),
+                        df["status"] == "Partial",
+                        df["status"] == "Failed",
+                    ],
+                    [10, 5, 1, 0],
+                    default=5,
+                )
+
+                # DateOffset cannot take a column of years, but there are only
+                # a few distinct validity values so offset one group at a time
+                expiry = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+                for years, group in df.groupby("validity_years"):
+                    expiry.loc[group.index] = group["acc"] + pd.DateOffset(years=int(years))
+
+                days_left = (expiry - pd.Timestamp(today)).dt.days
+
+                # Expiry plus the specific warning marks: 1 year, 6 months, 3, 2, 1 month.
+                # NaT rows fail every condition and fall through to the empty label
+                time_labels = np.select(
+                    [
+                        days_left <= 0,
+                        days_left == 365,
+                        days_left == 182,
+                        days_left == 91,
+                        days_left == 61,
+                        days_left == 30,
+                    ],
+                    ["EXPIRED", "1 Year", "6 Months", "3 Months", "2 Months", "1 Month"],
+                    default="",
+                )
+
+                for idx in np.flatnonzero(time_labels != ""):
+                    school, zone_code, state_email = rows[idx]
+                    expiry_date = expiry.iloc[idx].date()
+
                     try:
-                        # Assuming accredited_date is stored in ISO format (YYYY-MM-DD...)
-                        acc_date_str = school.accredited_date.split('T')[0] # Handle ISO with time if present
-                        acc_date = datetime.fromisoformat(acc_date_str).date()
-                        
-                        # Apply Validity Rules
-                        # 1. Foreign Zone (07) gets 10 years regardless of status
-                        if zone_code == "07":
-                            validity_years = 10
-                        else:
-                            # 2. Other zones based on status
-                            status = school.accreditation_status
-                            if status == "Full" or status == AccreditationStatus.ACCREDITED.value:
-                                validity_years = 5
-                            elif status == "Partial":
-                                validity_years = 1
-                            elif status == "Failed":
-                                validity_years = 0
-                            else:
-                                validity_years = 5 # Default fallback
-                        
-                        expiry_date = acc_date + relativedelta(years=validity_years)
-                        
-                        # Calculate time differences
-                        delta = relativedelta(expiry_date, today)
-                        
-                        # Check for expiration
-                        if today >= expiry_date:
+                        recipients = build_recipients(school, state_email)
+
+                        if time_labels[idx] == "EXPIRED":
                             print(f"[SCHEDULER] School {school.name} ({school.code}) accreditation expired (Status: {school.accreditation_status}, Zone: {zone_code}).")
                             school.accreditation_status = AccreditationStatus.UNACCREDITED.value
                             db.add(school)
-                            
-                            # Notify
-                            recipients = [settings.ADMIN_EMAIL]
-                            if school.email: recipients.append(school.email)
-                            state_stmt = select(State).filter(State.code == school.state_code)
-                            state_res = await db.execute(state_stmt)
-                            state = state_res.scalars().first()
-                            if state and state.email: recipients.append(state.email)
-                            
-                            # Note: send_accreditation_alert takes (to_emails, school_name, cc_emails)
-                            send_accreditation_alert(recipients, f"{school.name} (EXPIRED on {expiry_date.isoformat()})")
-                            continue
-
-                        # Check for specific warning marks: 1 year, 6 months, 3, 2, 1 month
-                        days_left = (expiry_date - today).days
-                        
-                        alert_needed = False
-                        time_label = ""
-                        
-                        if days_left == 365: # 1 year
-                            alert_needed = True
-                            time_label = "1 Year"
-                        elif days_left == 182: # ~6 months
-                            alert_needed = True
-                            time_label = "6 Months"
-                        elif days_left == 91: # ~3 months
-                            alert_needed = True
-                            time_label = "3 Months"
-                        elif days_left == 61: # ~2 months
-                            alert_needed = True
-                            time_label = "2 Months"
-                        elif days_left == 30: # 1 month
-                            alert_needed = True
-                            time_label = "1 Month"
-                        
-                        if alert_needed:
-                            recipients = [settings.ADMIN_EMAIL]
-                            if school.email: recipients.append(school.email)
-                            state_stmt = select(State).filter(State.code == school.state_code)
-                            state_res = await db.execute(state_stmt)
-                            state = state_res.scalars().first()
-                            if state and state.email: recipients.append(state.email)
-                            
-                            send_accreditation_alert(recipients, f"{school.name} (Due in {time_label} - Expiry: {expiry_date.isoformat()})")
-                            
+
+                            # Note: alert items are (to_emails, school_name) pairs
+                            alerts.append((recipients, f"{school.name} (EXPIRED on {expiry_date.isoformat()})"))
+                        else:
+                            alerts.append((recipients, f"{school.name} (Due in {time_labels[idx]} - Expiry: {expiry_date.isoformat()})"))
+
                     except Exception as e:
                         print(f"[SCHEDULER] Error processing school {school.name} ({school.code}): {e}")
-            
+
+            if alerts:
+                # One worker thread, one SMTP connection: the whole batch
+                # shares a single handshake + login
+                await asyncio.to_thread(send_accreditation_alerts, alerts)
+
             await db.commit()
         except Exception as e:
             print(f"[SCHEDULER] Error in main check: {e}")
@@ -1,5 +1,8 @@
 from passlib.context import CryptContext
 
+# passlib delegates the actual KDF to the native `bcrypt` package (pinned in
+# requirements.txt), not its pure-Python fallback, so hashing runs in compiled
+# code and releases the GIL
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password, hashed_password):
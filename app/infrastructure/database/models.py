@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Enum as SQLEnum, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Enum as SQLEnum, DateTime, Text, Index, func
 from sqlalchemy.orm import relationship
 from app.infrastructure.database.session import Base
 from datetime import datetime
@@ -28,11 +28,18 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
-    role = Column(String) # admin, hq, state, school, accountant, zone
-    state_code = Column(String, ForeignKey("states.code"), nullable=True)
+    # Native PG enum; declared with the raw values so the Python side keeps
+    # working with the plain strings compared throughout the endpoints
+    role = Column(SQLEnum(*(r.value for r in UserRole), name="user_role")) # admin, hq, state, school, accountant, zone
+    state_code = Column(String, ForeignKey("states.code"), nullable=True, index=True)
     zone_code = Column(String, ForeignKey("zones.code"), nullable=True)
     is_active = Column(Boolean, default=True)
 
+    # Case-insensitive login lookups use lower(email) directly
+    __table_args__ = (
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
+
 class Zone(Base):
     __tablename__ = "zones"
     code = Column(String, primary_key=True, index=True)
@@ -48,7 +55,7 @@ class State(Base):
     capital = Column(String, nullable=True)
     email = Column(String, nullable=True)
     ministry_email = Column(String, nullable=True)
-    zone_code = Column(String, ForeignKey("zones.code"))
+    zone_code = Column(String, ForeignKey("zones.code"), index=True)
     status = Column(String, default="active", server_default="active")
     is_locked = Column(Boolean, default=False, server_default="false")
 
@@ -63,7 +70,7 @@ class LGA(Base):
     __tablename__ = "lgas"
     code = Column(String, primary_key=True, index=True)
     name = Column(String)
-    state_code = Column(String, ForeignKey("states.code"), nullable=False)
+    state_code = Column(String, ForeignKey("states.code"), nullable=False, index=True)
 
     state = relationship("State", back_populates="lgas")
     custodians = relationship("Custodian", back_populates="lga")
@@ -75,8 +82,8 @@ class Custodian(Base):
     __tablename__ = "custodians"
     code = Column(String, primary_key=True, index=True)
     name = Column(String)
-    state_code = Column(String, ForeignKey("states.code"), nullable=True)
-    lga_code = Column(String, ForeignKey("lgas.code"), nullable=True)
+    state_code = Column(String, ForeignKey("states.code"), nullable=True, index=True)
+    lga_code = Column(String, ForeignKey("lgas.code"), nullable=True, index=True)
     town = Column(String)
     status = Column(String, default="active", server_default="active")
 
@@ -88,8 +95,8 @@ class BECECustodian(Base):
     __tablename__ = "bece_custodians"
     code = Column(String, primary_key=True, index=True)
     name = Column(String)
-    state_code = Column(String, ForeignKey("states.code"), nullable=True)
-    lga_code = Column(String, ForeignKey("lgas.code"), nullable=True)
+    state_code = Column(String, ForeignKey("states.code"), nullable=True, index=True)
+    lga_code = Column(String, ForeignKey("lgas.code"), nullable=True, index=True)
     town = Column(String)
     status = Column(String, default="active", server_default="active")
 
@@ -102,11 +109,11 @@ class School(Base):
     code = Column(String, primary_key=True, index=True)
     accrd_year = Column(String, primary_key=True, nullable=False, default="2025", server_default="2025")
     name = Column(String)
-    state_code = Column(String, ForeignKey("states.code"))
-    lga_code = Column(String, ForeignKey("lgas.code"))
-    custodian_code = Column(String, ForeignKey("custodians.code"))
+    state_code = Column(String, ForeignKey("states.code"), index=True)
+    lga_code = Column(String, ForeignKey("lgas.code"), index=True)
+    custodian_code = Column(String, ForeignKey("custodians.code"), index=True)
     email = Column(String, nullable=True)
-    accreditation_status = Column(String, default=AccreditationStatus.UNACCREDITED.value, server_default=AccreditationStatus.UNACCREDITED.value)
+    accreditation_status = Column(String, index=True, default=AccreditationStatus.UNACCREDITED.value, server_default=AccreditationStatus.UNACCREDITED.value)
     accreditation_type = Column(String, nullable=True, default=AccreditationType.RE.value, server_default=AccreditationType.RE.value) # Fresh-Accreditation or Re-Accreditation
     accredited_date = Column(String, nullable=True) # ISO format date
     category = Column(String, default="PUB", server_default="PUB") # PUB/PRV/FED
@@ -119,16 +126,23 @@ class School(Base):
     lga = relationship("LGA", back_populates="schools")
     custodian = relationship("Custodian", back_populates="schools")
 
+    # Covers the combined state/lga/custodian filters in get_schools, and the
+    # scheduler's status scan joined back to states
+    __table_args__ = (
+        Index("ix_schools_state_lga_cust", "state_code", "lga_code", "custodian_code"),
+        Index("ix_schools_status_state", "accreditation_status", "state_code"),
+    )
+
 class BECESchool(Base):
     __tablename__ = "bece_schools"
     code = Column(String, primary_key=True, index=True)
     accrd_year = Column(String, primary_key=True, nullable=False, default="2025", server_default="2025")
     name = Column(String)
-    state_code = Column(String, ForeignKey("states.code"))
-    lga_code = Column(String, ForeignKey("lgas.code"))
-    custodian_code = Column(String, ForeignKey("bece_custodians.code"))
+    state_code = Column(String, ForeignKey("states.code"), index=True)
+    lga_code = Column(String, ForeignKey("lgas.code"), index=True)
+    custodian_code = Column(String, ForeignKey("bece_custodians.code"), index=True)
     email = Column(String, nullable=True)
-    accreditation_status = Column(String, default=AccreditationStatus.UNACCREDITED.value, server_default=AccreditationStatus.UNACCREDITED.value)
+    accreditation_status = Column(String, index=True, default=AccreditationStatus.UNACCREDITED.value, server_default=AccreditationStatus.UNACCREDITED.value)
     accreditation_type = Column(String, nullable=True, default=AccreditationType.RE.value, server_default=AccreditationType.RE.value) # Fresh-Accreditation or Re-Accreditation
     accredited_date = Column(String, nullable=True) # ISO format date
     category = Column(String, default="PUB", server_default="PUB") # PUB/PRV/FED
@@ -141,6 +155,13 @@ class BECESchool(Base):
     lga = relationship("LGA", back_populates="bece_schools")
     custodian = relationship("BECECustodian", back_populates="bece_schools")
 
+    # Covers the combined state/lga/custodian filters in get_bece_schools, and
+    # the scheduler's status scan joined back to states
+    __table_args__ = (
+        Index("ix_bece_schools_state_lga_cust", "state_code", "lga_code", "custodian_code"),
+        Index("ix_bece_schools_status_state", "accreditation_status", "state_code"),
+    )
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
     id = Column(Integer, primary_key=True, index=True)
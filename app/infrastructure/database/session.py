@@ -1,10 +1,23 @@
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import get_settings
 
 settings = get_settings()
 
-engine = create_async_engine(settings.DATABASE_URL)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    pool_size=20,
+    max_overflow=40,
+    # Validate pooled connections before use and recycle them before the
+    # server/proxy idle timeout, so requests never inherit a dead socket
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    # Batch size for executemany INSERTs (bulk uploads)
+    insertmanyvalues_page_size=10_000,
+    # asyncpg-level statement cache so hot queries skip re-preparation
+    connect_args={"prepared_statement_cache_size": 256},
+)
 SessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
@@ -13,3 +26,25 @@ async def get_db():
     async with SessionLocal() as db:
         yield db
 
+
+async def bulk_insert(db: AsyncSession, model, records, copy_threshold: int = 1000):
+    """Insert a batch of record dicts, switching to PostgreSQL COPY when large.
+
+    COPY moves rows in the binary wire format and is several times faster than
+    even batched INSERTs; below the threshold, or on a non-asyncpg driver, a
+    plain executemany insert() is used instead. Runs inside the session's
+    current transaction either way.
+    """
+    if not records:
+        return
+    if len(records) > copy_threshold and engine.dialect.driver == "asyncpg":
+        columns = list(records[0])
+        rows = [tuple(record[column] for column in columns) for record in records]
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            model.__table__.name, records=rows, columns=columns
+        )
+    else:
+        await db.execute(insert(model), records)
+
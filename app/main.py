@@ -1,5 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.config import get_settings
 from fastapi.staticfiles import StaticFiles
 from app.api.v1.endpoints import auth, data, upload, export, audit
@@ -12,7 +14,17 @@ if not os.path.exists(UPLOAD_DIR):
 
 settings = get_settings()
 
-app = FastAPI(title="NECO Accreditation API", version="1.0.0")
+app = FastAPI(
+    title="NECO Accreditation API",
+    version="1.0.0",
+    # orjson serializes the big list responses several times faster than the
+    # stdlib encoder
+    default_response_class=ORJSONResponse,
+)
+
+# Compress anything over 1KB; the big list and export JSON payloads shrink
+# by an order of magnitude
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 app.add_middleware(
     CORSMiddleware,
@@ -1,64 +1,114 @@
 import asyncio
-from sqlalchemy import delete
+import logging
+import os
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.infrastructure.database.session import SessionLocal, engine, Base
-from app.infrastructure.database.models import User, UserRole, AuditLog
-from app.core.security import get_password_hash
+from app.infrastructure.database.models import User, UserRole
 from app.core.config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 async def seed_db():
-    # Create tables (only if they don't exist)
+    # Imported here so merely importing this module (or schema-only runs)
+    # doesn't pay for loading passlib/bcrypt
+    from app.core.security import get_password_hash
+
+    # Create tables only on an empty database; one has_table check replaces
+    # create_all's per-table reflection queries when the schema (owned by
+    # Alembic in production) is already in place
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        has_users = await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("users"))
+        if not has_users:
+            await conn.run_sync(Base.metadata.create_all)
     
     async with SessionLocal() as db:
         try:
-            # Clear existing data to ensure only new data exists
-            # Clear audit logs first due to foreign key
-            await db.execute(delete(AuditLog))
-            await db.execute(delete(User))
-            await db.commit()
-            print("Cleared existing users and audit logs.")
+            # Single context-managed transaction: commits once on exit,
+            # rolls back automatically on error. The precheck SELECT runs
+            # inside it too — a separate execute would autobegin and make
+            # the db.begin() below raise.
+            async with db.begin():
+                admin_email = settings.ADMIN_EMAIL
+                hq_email = "accreditation@neco.gov.ng"
+                acc_email = "account@neco.gov.ng"
+
+                # Fast path for the common idempotent re-run (pod restart,
+                # CI): if all three accounts are already present and active,
+                # skip the hashing and the write entirely
+                if os.getenv("SEED_FORCE") != "1":
+                    result = await db.execute(
+                        select(User.email).filter(User.email.in_([admin_email, hq_email, acc_email]), User.is_active)
+                    )
+                    if len(result.scalars().all()) == 3:
+                        logger.info("Database already seeded; set SEED_FORCE=1 to refresh")
+                        return
 
-            # Create Admin
-            admin_email = settings.ADMIN_EMAIL
-            admin = User(
-                email=admin_email,
-                hashed_password=get_password_hash(settings.ADMIN_PASSWORD),
-                role=UserRole.ADMIN.value,
-                is_active=True
-            )
-            db.add(admin)
-            print(f"Admin user created: {admin_email}")
+                # The fixed HQ/Accountant passwords can ship as pre-generated
+                # hashes via the environment; only missing ones are hashed here.
+                # bcrypt releases the GIL, so hashing the passwords in worker
+                # threads takes ~one hash of wall time instead of three
+                async def hash_or_reuse(plain_password, precomputed=""):
+                    if precomputed:
+                        return precomputed
+                    return await asyncio.to_thread(get_password_hash, plain_password)
 
-            # HQ User
-            hq_email = "accreditation@neco.gov.ng"
-            hq = User(
-                email=hq_email,
-                hashed_password=get_password_hash("password@123"),
-                role=UserRole.HQ.value,
-                is_active=True
-            )
-            db.add(hq)
-            print(f"HQ user created: {hq_email}")
+                admin_hash, hq_hash, acc_hash = await asyncio.gather(
+                    hash_or_reuse(settings.ADMIN_PASSWORD),
+                    hash_or_reuse("password@123", settings.HQ_PASSWORD_HASH),
+                    hash_or_reuse("Account123", settings.ACCOUNTANT_PASSWORD_HASH),
+                )
 
-            # Accountant User
-            acc_email = "account@neco.gov.ng"
-            acc = User(
-                email=acc_email,
-                hashed_password=get_password_hash("Account123"),
-                role=UserRole.ACCOUNTANT.value,
-                is_active=True
-            )
-            db.add(acc)
-            print(f"Accountant user created: {acc_email}")
-            
-            await db.commit()
+                # Admin, HQ, and Accountant in one executemany INSERT instead of
+                # three ORM flushes
+                rows = [
+                    {
+                        "email": admin_email,
+                        "hashed_password": admin_hash,
+                        "role": UserRole.ADMIN.value,
+                        "is_active": True,
+                    },
+                    {
+                        "email": hq_email,
+                        "hashed_password": hq_hash,
+                        "role": UserRole.HQ.value,
+                        "is_active": True,
+                    },
+                    {
+                        "email": acc_email,
+                        "hashed_password": acc_hash,
+                        "role": UserRole.ACCOUNTANT.value,
+                        "is_active": True,
+                    },
+                ]
+                # Idempotent upsert on email: refreshes the password/role/active
+                # flag in place instead of wiping users (and their audit logs)
+                # and re-inserting. ON CONFLICT rules out COPY, so this goes
+                # through a plain insert rather than bulk_insert's fast path.
+                stmt = pg_insert(User).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[User.email],
+                    set_={
+                        "hashed_password": stmt.excluded.hashed_password,
+                        "role": stmt.excluded.role,
+                        "is_active": stmt.excluded.is_active,
+                    },
+                )
+                await db.execute(stmt)
+                logger.info("Admin user created: %s", admin_email)
+                logger.info("HQ user created: %s", hq_email)
+                logger.info("Accountant user created: %s", acc_email)
 
         except Exception as e:
-            await db.rollback()
-            print(f"Error seeding database: {e}")
+            logger.error("Error seeding database: %s", e)
+            # Propagate so a failed seed exits non-zero instead of hiding
+            raise
 
-if __name__ == "__main__":
+def seed_db_sync():
+    """Synchronous entrypoint for callers without a running event loop."""
     asyncio.run(seed_db())
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    seed_db_sync()